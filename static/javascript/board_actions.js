@@ -0,0 +1,57 @@
+// Sends the dashboard's move and rename forms to the board action endpoint,
+// then applies the returned lanes and tasks in place instead of reloading the board.
+
+function applyBoardChanges(changes)
+{
+  changes.tasks.forEach(function (task) {
+    let taskElement = document.getElementById("task-" + task.id)
+    let laneTasks = document.querySelector("#lane-" + task.lane + " .lane-tasks")
+    if (taskElement && laneTasks && taskElement.parentElement !== laneTasks)
+    {
+      let emptyMessage = laneTasks.querySelector(".no-tasks")
+      if (emptyMessage)
+      {
+        emptyMessage.remove()
+      }
+      laneTasks.appendChild(taskElement)
+    }
+  })
+
+  changes.lanes.forEach(function (lane) {
+    let laneElement = document.getElementById("lane-" + lane.id)
+    if (laneElement)
+    {
+      laneElement.dataset.order = lane.order
+      laneElement.querySelector(".lane-name-label").textContent = lane.name
+      laneElement.querySelector(".lane-name-input").value = lane.name
+    }
+  })
+
+  let board = document.querySelector(".board")
+  if (board && changes.lanes.length > 0)
+  {
+    Array.from(board.querySelectorAll(":scope > .lane"))
+      .sort(function (a, b) { return a.dataset.order - b.dataset.order })
+      .forEach(function (laneElement) { board.appendChild(laneElement) })
+  }
+}
+
+function setupBoardActions()
+{
+  document.querySelectorAll("form[data-board-action]").forEach(function (form) {
+    form.addEventListener("submit", function (event) {
+      event.preventDefault()
+      fetch(boardActionUrl, {method: "POST", body: new FormData(form)})
+        .then(function (response) {
+          return response.ok ? response.json() : Promise.reject(response)
+        })
+        .then(applyBoardChanges)
+        .catch(function () {
+          // Fall back to a normal form post, which reloads the dashboard
+          form.submit()
+        })
+    })
+  })
+}
+
+document.addEventListener("DOMContentLoaded", setupBoardActions)
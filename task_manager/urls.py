@@ -21,10 +21,13 @@ urlpatterns = [
     path('sign_up/', views.SignUpView.as_view(), name='sign_up'),
     path('task_create/', views.CreateTaskView.as_view(), name='task_create'),
     path('task_search/', views.task_search, name='task_search'),
+    path('task_search/export/', views.task_export, name='task_export'),
     path('task_delete/<int:pk>/', views.DeleteTaskView.as_view(), name='task_delete'),
     path('task_edit/<int:pk>/', views.TaskEditView.as_view(), name = 'task_edit'),
     path('task/<int:pk>/', views.TaskView.as_view(), name='task'),
     path('lane_delete/<int:lane_id>/', views.DeleteLaneView.as_view(), name='lane_delete'),
     path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
-    path('notif_delete/<int:notif_id>/',views.notif_delete,name='notif_delete')
+    path('dashboard/actions/', views.BoardActionView.as_view(), name='board_action'),
+    path('notif_delete/<int:notif_id>/',views.notif_delete,name='notif_delete'),
+    path('notifications/', views.notification_inbox, name='notification_inbox')
 ]+ static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
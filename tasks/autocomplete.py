@@ -0,0 +1,230 @@
+"""An in-memory index of usernames for suggesting users as they are typed."""
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from hashlib import md5
+from threading import Lock
+from uuid import uuid4
+from django.core.cache import cache
+from .models import User
+
+AUTOCOMPLETE_LIMIT = 10
+# Suggestions for a team are reused this long, in the cache and by the browser
+AUTOCOMPLETE_TIMEOUT = 30
+INDEX_VERSION_KEY = 'username_index_version'
+# Processes further behind than this rebuild their index rather than replay every change
+MAX_REPLAYED_CHANGES = 100
+CHANGE_TIMEOUT = 3600
+# Separates usernames in the searchable text; it can never appear in a username
+_SEPARATOR = '\n'
+# Substrings this common are found faster by scanning, which stops at the first few matches
+DENSE_MATCHES = 1000
+
+
+def _trigrams(key):
+    return {key[start:start + 3] for start in range(len(key) - 2)}
+
+
+class UsernameIndex:
+    """Every username, sorted by its lower case form, for prefix and substring lookups
+
+    Prefix matches are found by bisecting the sorted names. Other matches
+    are narrowed down by the three letter sequences they share with the
+    query, or, when those are too common to help, by scanning one string
+    holding all the names until enough are found."""
+
+    def __init__(self, users=()):
+        self.by_id = dict(users)
+        self.entries = sorted((username.lower(), username) for username in self.by_id.values())
+        self.trigrams = defaultdict(set)
+        for entry in self.entries:
+            for trigram in _trigrams(entry[0]):
+                self.trigrams[trigram].add(entry)
+        self._text = None
+        self._starts = None
+
+    def _searchable(self):
+        if self._text is None:
+            keys = [key for key, username in self.entries]
+            self._starts = []
+            position = 0
+            for key in keys:
+                self._starts.append(position)
+                position += len(key) + len(_SEPARATOR)
+            self._text = _SEPARATOR.join(keys)
+        return self._text, self._starts
+
+    def add(self, user_id, username):
+        self.remove(user_id)
+        self.by_id[user_id] = username
+        entry = (username.lower(), username)
+        insort(self.entries, entry)
+        for trigram in _trigrams(entry[0]):
+            self.trigrams[trigram].add(entry)
+        self._text = None
+
+    def remove(self, user_id):
+        username = self.by_id.pop(user_id, None)
+        if username is not None:
+            entry = (username.lower(), username)
+            position = bisect_left(self.entries, entry)
+            if position < len(self.entries) and self.entries[position] == entry:
+                del self.entries[position]
+            for trigram in _trigrams(entry[0]):
+                self.trigrams[trigram].discard(entry)
+            self._text = None
+
+    def _prefixed(self, prefix):
+        for position in range(bisect_left(self.entries, (prefix,)), len(self.entries)):
+            key, username = self.entries[position]
+            if not key.startswith(prefix):
+                return
+            yield username
+
+    def _containing(self, query):
+        if len(query) >= 3:
+            candidates = sorted((self.trigrams.get(trigram, set()) for trigram in _trigrams(query)), key=len)
+            if len(candidates[0]) < DENSE_MATCHES:
+                matches = candidates[0].intersection(*candidates[1:])
+                for key, username in sorted(matches):
+                    if query in key:
+                        yield username
+                return
+        yield from self._scan(query)
+
+    def _scan(self, query):
+        text, starts = self._searchable()
+        found = text.find(query)
+        while found != -1:
+            entry = bisect_right(starts, found) - 1
+            yield self.entries[entry][1]
+            # Carry on from the next username, so each is given once
+            next_start = starts[entry + 1] if entry + 1 < len(starts) else len(text)
+            found = text.find(query, next_start)
+
+    def suggest(self, query, exclude=(), limit=AUTOCOMPLETE_LIMIT):
+        """Return up to limit usernames containing the query, those starting with it first"""
+
+        query = query.lower()
+        if not query or _SEPARATOR in query:
+            return []
+        exclude = set(exclude)
+        prefixes = [query] if query.startswith('@') else [query, '@' + query]
+        suggestions = []
+        seen = set()
+        candidates = [self._prefixed(prefix) for prefix in prefixes] + [self._containing(query)]
+        for matches in candidates:
+            for username in matches:
+                if username in seen or username in exclude:
+                    continue
+                seen.add(username)
+                suggestions.append(username)
+                if len(suggestions) >= limit:
+                    return suggestions
+        return suggestions
+
+
+_index = None
+_index_version = None
+_lock = Lock()
+
+
+def _change_key(version):
+    return f'{INDEX_VERSION_KEY}:{version}'
+
+
+def _current_version():
+    """Return the shared index version, starting a new one if the cache has none
+
+    New versions start from a random number, so a version lost from the
+    cache is never confused with one counted up to before."""
+
+    version = cache.get(INDEX_VERSION_KEY)
+    if version is None:
+        cache.add(INDEX_VERSION_KEY, uuid4().int >> 80, None)
+        version = cache.get(INDEX_VERSION_KEY)
+    return version
+
+
+def _catch_up(version):
+    """Apply the changes other processes made since this process's index was current
+
+    Returns False if they are too many or no longer all cached, in which
+    case the index has to be rebuilt."""
+
+    global _index_version
+    missed = range(_index_version + 1, version + 1)
+    if not 0 < len(missed) <= MAX_REPLAYED_CHANGES:
+        return False
+    changes = cache.get_many([_change_key(number) for number in missed])
+    if len(changes) != len(missed):
+        return False
+    for number in missed:
+        user_id, username = changes[_change_key(number)]
+        if username is None:
+            _index.remove(user_id)
+        else:
+            _index.add(user_id, username)
+    _index_version = version
+    return True
+
+
+def username_index():
+    """Return this process's username index, brought up to date with the changes of every process"""
+
+    global _index, _index_version
+    version = _current_version()
+    with _lock:
+        if _index is None or (_index_version != version and not _catch_up(version)):
+            _index = UsernameIndex(User.objects.values_list('id', 'username'))
+            _index_version = version
+        return _index
+
+
+def update_username_index(user_id, username=None):
+    """Record that a user was saved with the given username, or deleted when there is none
+
+    Unless the username is unchanged, the change is logged under a new
+    version in the shared cache for other processes to replay, and applied
+    to this process's index."""
+
+    if _index is not None and _index_version == cache.get(INDEX_VERSION_KEY):
+        if _index.by_id.get(user_id) == username:
+            return
+    # The cache may count two processes up to the same version, so a
+    # version is only taken once its change is the first logged under it
+    while True:
+        try:
+            version = cache.incr(INDEX_VERSION_KEY)
+        except ValueError:
+            _current_version()
+            continue
+        if cache.add(_change_key(version), (user_id, username), CHANGE_TIMEOUT):
+            break
+    with _lock:
+        if _index is not None:
+            _catch_up(version)
+
+
+def suggest_usernames(query, exclude=(), limit=AUTOCOMPLETE_LIMIT):
+    """Return up to limit usernames matching the query, those starting with it first"""
+
+    return username_index().suggest(query, exclude, limit)
+
+
+def suggest_invitees(team_id, query, username):
+    """Return suggestions for the last username in the query, leaving out anyone the team already has
+
+    The user asking and usernames already in the query are left out too.
+    Suggestions are cached briefly by team and query, so typing and
+    deleting back over the same letters looks nothing up again."""
+
+    typed = query.split(' ')
+    digest = md5(query.encode(), usedforsecurity=False).hexdigest()
+    key = f'autocomplete:{team_id}:{_current_version()}:{digest}'
+    suggestions = cache.get(key)
+    if suggestions is None:
+        members = User.objects.filter(team=team_id).values_list('username', flat=True)
+        # One spare, in case the user asking is among them
+        suggestions = suggest_usernames(typed[-1], exclude=[*typed, *members], limit=AUTOCOMPLETE_LIMIT + 1)
+        cache.set(key, suggestions, AUTOCOMPLETE_TIMEOUT)
+    return [suggestion for suggestion in suggestions if suggestion != username][:AUTOCOMPLETE_LIMIT]
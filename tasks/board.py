@@ -0,0 +1,218 @@
+"""Loading and changing a team's board."""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, F, Max, Min, OuterRef, Prefetch, Subquery
+from django.shortcuts import get_object_or_404
+from .models import Lane, Task
+from .revisions import bump_team_revisions
+
+# Lanes are numbered this far apart so that a lane can be moved by
+# renumbering it alone, into the gap next to its new neighbour.
+LANE_ORDER_GAP = 1024
+
+
+def unfinished_dependencies():
+    """Return an expression that is true for tasks with a dependency not yet in its team's last lane"""
+
+    last_lane = Lane.objects.filter(team=OuterRef('assigned_team')).order_by('-lane_order').values('id')[:1]
+    return Exists(Task.objects.filter(task=OuterRef('pk')).exclude(lane=Subquery(last_lane)))
+
+
+def board_tasks(team):
+    """Return a query set of the team's tasks annotated with what the board displays
+
+    Each task carries whether any of its dependencies is unfinished, in the same query."""
+
+    return Task.objects.filter(assigned_team=team).annotate(
+        blocked=unfinished_dependencies(),
+    ).order_by('id')
+
+
+def load_board(team):
+    """Return the team's lanes in order, each holding its own tasks in board_tasks
+
+    Lanes and tasks are fetched with one query each, so rendering the board
+    is linear in the number of tasks no matter how many lanes there are."""
+
+    if team is None:
+        return []
+
+    return list(
+        Lane.objects.filter(team=team).order_by('lane_order').prefetch_related(
+            Prefetch('task_set', queryset=board_tasks(team), to_attr='board_tasks')
+        )
+    )
+
+
+def add_lane(team):
+    """Add a new lane at the end of the team's board"""
+
+    max_order = Lane.objects.filter(team=team).aggregate(Max('lane_order'))['lane_order__max'] or 0
+    return Lane.objects.create(lane_name="New Lane", lane_order=max_order + LANE_ORDER_GAP, team=team)
+
+
+def rename_lane(team, lane_id, new_lane_name):
+    """Rename one of the team's lanes, raising ValidationError if the name is invalid"""
+
+    lane = get_object_or_404(Lane, id=lane_id, team=team)
+    lane.lane_name = new_lane_name
+    lane.full_clean()
+    lane.save()
+    return lane
+
+
+def move_task(team, task_id, step):
+    """Move one of the team's tasks to the neighbouring lane on the left (-1) or right (+1)
+
+    Returns the task, which stays where it is if there is no lane in that direction."""
+
+    task = get_object_or_404(Task.objects.select_related('lane'), pk=task_id, assigned_team=team)
+    lanes = Lane.objects.filter(team=team)
+    if step < 0:
+        neighbour = lanes.filter(lane_order__lt=task.lane.lane_order).order_by('-lane_order').first()
+    else:
+        neighbour = lanes.filter(lane_order__gt=task.lane.lane_order).order_by('lane_order').first()
+    if neighbour:
+        task.lane = neighbour
+        task.save()
+    return task
+
+
+def move_tasks(team, task_ids, lane_id):
+    """Move a set of the team's tasks into one of its lanes with a single UPDATE
+
+    Raises ValidationError, changing nothing, unless every task belongs to the team.
+    Returns the moved tasks."""
+
+    lane = get_object_or_404(Lane, id=lane_id, team=team)
+    try:
+        task_ids = {int(task_id) for task_id in task_ids}
+    except (TypeError, ValueError):
+        raise ValidationError('Task ids must be whole numbers.')
+    if not task_ids:
+        return []
+
+    with transaction.atomic():
+        moved = Task.objects.filter(pk__in=task_ids, assigned_team=team).update(lane=lane)
+        if moved != len(task_ids):
+            raise ValidationError('Only tasks of the current team can be moved.')
+        bump_team_revisions([team.id])
+    return list(Task.objects.filter(pk__in=task_ids).only('id', 'name', 'lane').order_by('id'))
+
+
+def _set_lane_orders(team, ordered_lanes):
+    """Renumber the team's lanes LANE_ORDER_GAP apart in the given order
+
+    The lanes are first shifted below every order currently in use, so
+    neither update can trip the unique (lane_order, team) constraint
+    halfway through."""
+
+    lanes = Lane.objects.filter(team=team)
+    bounds = lanes.aggregate(low=Min('lane_order'), high=Max('lane_order'))
+    if bounds['high'] is None:
+        return []
+    shift = bounds['high'] - bounds['low'] + 1 + max(bounds['high'], 0)
+    lanes.update(lane_order=F('lane_order') - shift)
+    for position, lane in enumerate(ordered_lanes, start=1):
+        lane.lane_order = position * LANE_ORDER_GAP
+    Lane.objects.bulk_update(ordered_lanes, ['lane_order'])
+    bump_team_revisions([team.id])
+    return ordered_lanes
+
+
+def rebalance_lanes(team):
+    """Spread the team's lanes LANE_ORDER_GAP apart again, keeping their order"""
+
+    with transaction.atomic():
+        return _set_lane_orders(team, list(Lane.objects.select_for_update().filter(team=team).order_by('lane_order')))
+
+
+def reorder_lanes(team, lane_ids):
+    """Put all of the team's lanes in the given order in one transaction
+
+    Raises ValidationError unless lane_ids lists every lane of the team exactly once."""
+
+    with transaction.atomic():
+        lanes = {str(lane.id): lane for lane in Lane.objects.select_for_update().filter(team=team)}
+        lane_ids = [str(lane_id) for lane_id in lane_ids]
+        if len(lane_ids) != len(lanes) or set(lane_ids) != set(lanes):
+            raise ValidationError('The new order must list every lane of the team exactly once.')
+        return _set_lane_orders(team, [lanes[lane_id] for lane_id in lane_ids])
+
+
+def _order_beyond(neighbours, step):
+    """Return a free order just past the nearest neighbour, or None if there is no room left"""
+
+    nearest = neighbours[0]
+    if len(neighbours) > 1:
+        farther = neighbours[1]
+    elif step < 0:
+        farther = 0
+    else:
+        farther = nearest + 2 * LANE_ORDER_GAP
+    if abs(farther - nearest) < 2:
+        return None
+    return (nearest + farther) // 2
+
+
+def move_lane(team, lane_id, step):
+    """Move one of the team's lanes past its neighbour on the left (-1) or right (+1)
+
+    The lane is given an order in the gap beyond its neighbour, so a move
+    normally updates that one lane. Only when the gap is used up are the
+    team's lanes rebalanced first. Returns the lanes whose order changed."""
+
+    with transaction.atomic():
+        lane = get_object_or_404(Lane.objects.select_for_update(), pk=lane_id, team=team)
+        lanes = Lane.objects.filter(team=team)
+        if step < 0:
+            neighbours = lanes.filter(lane_order__lt=lane.lane_order).order_by('-lane_order')
+        else:
+            neighbours = lanes.filter(lane_order__gt=lane.lane_order).order_by('lane_order')
+        neighbours = list(neighbours.values_list('lane_order', flat=True)[:2])
+        if not neighbours:
+            return []
+
+        new_order = _order_beyond(neighbours, step)
+        if new_order is not None:
+            lane.lane_order = new_order
+            lane.save(update_fields=['lane_order'])
+            return [lane]
+
+        rebalance_lanes(team)
+        moved = move_lane(team, lane_id, step)
+        return list(Lane.objects.filter(team=team).order_by('lane_order')) if moved else []
+
+
+def apply_board_action(team, data):
+    """Apply the board action named in the posted data
+
+    Returns a (lanes, tasks) pair of what changed, or None if no known
+    action was posted."""
+
+    if 'add_lane' in data:
+        return [add_lane(team)], []
+    elif 'rename_lane' in data:
+        return [rename_lane(team, data.get('rename_lane'), data.get('new_lane_name'))], []
+    elif 'move_task_left' in data:
+        return [], [move_task(team, data.get('move_task_left'), -1)]
+    elif 'move_task_right' in data:
+        return [], [move_task(team, data.get('move_task_right'), 1)]
+    elif 'move_lane_left' in data:
+        return move_lane(team, data.get('move_lane_left'), -1), []
+    elif 'move_lane_right' in data:
+        return move_lane(team, data.get('move_lane_right'), 1), []
+    elif 'move_tasks' in data:
+        return [], move_tasks(team, data.getlist('move_tasks'), data.get('target_lane'))
+    elif 'reorder_lanes' in data:
+        return reorder_lanes(team, data.getlist('reorder_lanes')), []
+    return None
+
+
+def serialize_changes(lanes, tasks):
+    """Return the changed lanes and tasks in the form sent back to the board"""
+
+    return {
+        'lanes': [{'id': lane.id, 'name': lane.lane_name, 'order': lane.lane_order} for lane in lanes],
+        'tasks': [{'id': task.id, 'name': task.name, 'lane': task.lane_id} for task in tasks],
+    }
@@ -0,0 +1,88 @@
+"""ETag stamps so unchanged pages can be answered with 304 Not Modified."""
+from datetime import date
+from hashlib import md5
+from django.contrib import messages
+from django.db.models import Count, Max, Q
+from django.middleware.csrf import get_token
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from .models import Task, Team
+
+
+def _menu_parts(request):
+    """Return what the navigation bar of every page depends on
+
+    The menu lists the user's teams and their notifications for the current
+    team. Any change to one of the user's teams moves that team's revised_at
+    to now, so the latest stamp across their teams covers all of them. The
+    pages' forms carry a token made from the CSRF secret, which changes when
+    the user logs in again, so a copy holding an old token is never reused."""
+
+    # get_token makes the secret first if the client has none yet
+    get_token(request)
+    parts = [request.META['CSRF_COOKIE']]
+    user = request.user
+    if not user.is_authenticated:
+        return parts + ['anonymous']
+
+    teams = user.team_set.aggregate(count=Count('id'), revised_at=Max('revised_at'))
+    notifications = user.notifications.aggregate(
+        latest=Max('id'), total=Count('id'), unread=Count('id', filter=Q(is_read=False))
+    )
+    return parts + [
+        user.id, request.session.get('current_team_id'), date.today(),
+        teams['count'], teams['revised_at'],
+        notifications['latest'], notifications['total'], notifications['unread'],
+    ]
+
+
+def dashboard_stamp(request, *args, **kwargs):
+    """Return the parts of the stamp of the dashboard of the team being viewed"""
+
+    parts = _menu_parts(request)
+    # DashboardView has already switched the session to any team asked for
+    team_id = request.session.get('current_team_id')
+    team = None
+    if str(team_id).isdigit():
+        team = Team.objects.filter(pk=team_id).values('id', 'revision', 'revised_at').first()
+    if team is None:
+        team = request.user.team_set.order_by('pk').values('id', 'revision', 'revised_at').first()
+    if team is not None:
+        parts += [team['id'], team['revision'], team['revised_at']]
+    return parts
+
+
+def task_stamp(request, pk, *args, **kwargs):
+    """Return the parts of the stamp of a task page, which changes whenever the task's team does"""
+
+    team = Task.objects.filter(pk=pk).values('assigned_team__revision', 'assigned_team__revised_at').first()
+    if team is None:
+        return None
+    return _menu_parts(request) + [pk, team['assigned_team__revision'], team['assigned_team__revised_at']]
+
+
+def search_stamp(request, *args, **kwargs):
+    """Return the parts of the stamp of the task search, which covers the tasks of every team"""
+
+    teams = Team.objects.aggregate(count=Count('id'), revised_at=Max('revised_at'))
+    return _menu_parts(request) + [teams['count'], teams['revised_at']]
+
+
+def conditional_page(stamp):
+    """Decorate a view so that clients holding an unchanged copy get a 304 before any rendering
+
+    Only an ETag is given: a Last-Modified date could not follow everything
+    the stamp covers, such as the session's team and CSRF secret. Pages with
+    messages waiting are always rendered, otherwise a 304 would swallow them."""
+
+    def etag(request, *args, **kwargs):
+        if len(messages.get_messages(request)):
+            return None
+        parts = stamp(request, *args, **kwargs)
+        return None if parts is None else md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag)(view)
+        return cache_control(private=True, no_cache=True)(conditional_view)
+
+    return decorator
@@ -0,0 +1,18 @@
+from django.utils.functional import SimpleLazyObject
+from .notifications import MENU_FEED_SIZE, load_notification_feed, notification_counts
+
+
+def notifications(request):
+    """Make the logged in user's latest notifications and their counts available to every template
+
+    Nothing is loaded unless a template actually renders it."""
+
+    if not request.user.is_authenticated:
+        return {}
+    team_id = request.session.get("current_team_id")
+    return {
+        'notification_feed': SimpleLazyObject(
+            lambda: load_notification_feed(request.user, team_id=team_id, limit=MENU_FEED_SIZE)
+        ),
+        'notification_counts': SimpleLazyObject(lambda: notification_counts(request.user)),
+    }
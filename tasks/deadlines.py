@@ -0,0 +1,87 @@
+"""Scheduled generation of deadline notifications, kept off the request path."""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from django.db import transaction
+from .models import Task, Team, TaskNotification
+from .notifications import bulk_send_notifications, invalidate_notification_counts, recipient_ids
+
+DEFAULT_BATCH_SIZE = 500
+REMINDER_DAYS = 5
+
+
+def due_tasks(team=None):
+    """Return a query set of the tasks whose deadline notifications need refreshing today
+
+    A task only needs attention once its deadline_notif_sent date has passed,
+    which covers new tasks, rescheduled tasks and tasks entering their final days."""
+
+    tasks = Task.objects.filter(deadline_notif_sent__lt=datetime.today().date())
+    if team is not None:
+        tasks = tasks.filter(assigned_team=team)
+    return tasks
+
+
+def refresh_deadline_notifications(tasks):
+    """Bring the deadline notifications of the given tasks up to date and return the tasks changed
+
+    Tasks still outside their reminder window lose any deadline notifications
+    they had. Tasks inside it get one fresh deadline notification per team
+    member. The work is done with a fixed number of queries however many
+    notifications the team members already hold."""
+
+    today = datetime.today().date()
+    retracted = []
+    notified = []
+    for task in tasks:
+        reminder_date = (task.due_date - timedelta(days=REMINDER_DAYS)).date()
+        if today < reminder_date:
+            if task.deadline_notif_sent != reminder_date:
+                task.deadline_notif_sent = reminder_date
+                retracted.append(task)
+        elif task.deadline_notif_sent < today:
+            task.deadline_notif_sent = today
+            notified.append(task)
+
+    changed = retracted + notified
+    if not changed:
+        return []
+
+    with transaction.atomic():
+        stale = TaskNotification.objects.filter(
+            task__in=[task.id for task in changed],
+            notification_type=TaskNotification.NotificationType.DEADLINE
+        )
+        invalidate_notification_counts(recipient_ids(stale))
+        stale.delete()
+
+        members = defaultdict(list)
+        memberships = Team.team_members.through.objects.filter(
+            team_id__in={task.assigned_team_id for task in notified}
+        ).values_list('team_id', 'user_id')
+        for team_id, user_id in memberships:
+            members[team_id].append(user_id)
+
+        bulk_send_notifications(
+            (user_id, TaskNotification(task=task, notification_type=TaskNotification.NotificationType.DEADLINE))
+            for task in notified
+            for user_id in members[task.assigned_team_id]
+        )
+        Task.objects.bulk_update(changed, ['deadline_notif_sent'])
+    return changed
+
+
+def sweep_deadlines(team=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Refresh the deadline notifications of due tasks in batches and return how many were processed"""
+
+    processed = 0
+    last_id = 0
+    while True:
+        batch = list(
+            due_tasks(team).filter(id__gt=last_id).only('id', 'due_date', 'deadline_notif_sent', 'assigned_team').order_by('id')[:batch_size]
+        )
+        if not batch:
+            break
+        refresh_deadline_notifications(batch)
+        processed += len(batch)
+        last_id = batch[-1].id
+    return processed
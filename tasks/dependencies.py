@@ -0,0 +1,280 @@
+"""A team's task dependency graph, loaded in one query and cached against the team's revision,
+and the closure table that answers transitive dependency questions with one indexed query."""
+from collections import defaultdict
+from heapq import heapify, heappop, heappush
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from .models import DependencyClosure, Task
+
+GRAPH_TIMEOUT = 3600
+
+
+class DependencyGraph:
+    """The tasks of a team and which of them each task depends on
+
+    Every task maps to a tuple of the tasks it depends on (its blockers)
+    and a tuple of the tasks depending on it. Tasks are referred to by id;
+    names and due dates are kept for display and ordering."""
+
+    def __init__(self, rows=()):
+        self.names = {}
+        self.due_dates = {}
+        depends_on = {}
+        for task_id, name, due_date, dependency_id in rows:
+            self.names[task_id] = name
+            self.due_dates[task_id] = due_date
+            depends_on.setdefault(task_id, [])
+            if dependency_id is not None:
+                depends_on[task_id].append(dependency_id)
+
+        dependents = {task_id: [] for task_id in depends_on}
+        for task_id, dependency_ids in depends_on.items():
+            for dependency_id in dependency_ids:
+                dependents.setdefault(dependency_id, []).append(task_id)
+        self.depends_on = {task_id: tuple(sorted(ids)) for task_id, ids in depends_on.items()}
+        self.dependents = {task_id: tuple(sorted(ids)) for task_id, ids in dependents.items()}
+
+    @classmethod
+    def load(cls, team):
+        """Load the team's graph with a single query"""
+
+        return cls(
+            Task.objects.filter(assigned_team=team).order_by('id').values_list('id', 'name', 'due_date', 'dependencies')
+        )
+
+    def names_of(self, task_ids):
+        """Return the names of the given tasks, in the order given"""
+
+        return [self.names[task_id] for task_id in task_ids if task_id in self.names]
+
+    def _reachable(self, start_ids, edges):
+        seen = set()
+        stack = list(start_ids)
+        while stack:
+            task_id = stack.pop()
+            if task_id not in seen:
+                seen.add(task_id)
+                stack.extend(edges.get(task_id, ()))
+        return seen
+
+    def blockers(self, task_id):
+        """Return the ids of every task the task depends on, directly or through other tasks"""
+
+        return self._reachable(self.depends_on.get(task_id, ()), self.depends_on)
+
+    def unblocks(self, task_id):
+        """Return the ids of every task that depends on the task, directly or through other tasks"""
+
+        return self._reachable(self.dependents.get(task_id, ()), self.dependents)
+
+    def find_cycle(self, task_id, dependency_ids):
+        """Return the ids of a cycle that depending on dependency_ids would close, or None if there is none
+
+        The cycle starts and ends with the task itself."""
+
+        for dependency_id in sorted(dependency_ids):
+            path = self._path(dependency_id, task_id)
+            if path is not None:
+                return [task_id, *path]
+        return None
+
+    def _path(self, start_id, end_id):
+        """Return the ids along a chain of dependencies from one task to another, or None"""
+
+        previous = {start_id: None}
+        stack = [start_id]
+        while stack:
+            task_id = stack.pop()
+            if task_id == end_id:
+                path = []
+                while task_id is not None:
+                    path.append(task_id)
+                    task_id = previous[task_id]
+                return path[::-1]
+            # Pushed in reverse, so lower ids are followed first
+            for dependency_id in reversed(self.depends_on.get(task_id, ())):
+                if dependency_id not in previous:
+                    previous[dependency_id] = task_id
+                    stack.append(dependency_id)
+        return None
+
+    def topological_order(self):
+        """Return every task id with each task after all the tasks it depends on
+
+        Tasks free to go in either order are ordered by id. Raises
+        ValidationError if the dependencies form a cycle."""
+
+        waiting = {task_id: len(ids) for task_id, ids in self.depends_on.items()}
+        for task_id in self.dependents:
+            waiting.setdefault(task_id, 0)
+        ready = [task_id for task_id, count in waiting.items() if count == 0]
+        heapify(ready)
+        order = []
+        while ready:
+            task_id = heappop(ready)
+            order.append(task_id)
+            for dependent_id in self.dependents.get(task_id, ()):
+                waiting[dependent_id] -= 1
+                if waiting[dependent_id] == 0:
+                    heappush(ready, dependent_id)
+        if len(order) != len(waiting):
+            raise ValidationError('Task dependencies cannot form a cycle.')
+        return order
+
+    def critical_path(self, task_id=None):
+        """Return the ids of the longest chain of dependencies, first task first
+
+        With a task_id, only chains ending at that task are considered.
+        Between chains of equal length the one whose tasks fall due latest
+        wins, since that is the chain with the least slack."""
+
+        best = {}
+        for current in self.topological_order():
+            chain = max(
+                (best[dependency_id] for dependency_id in self.depends_on.get(current, ()) if dependency_id in best),
+                key=self._chain_key,
+                default=(),
+            )
+            best[current] = (*chain, current)
+        if task_id is not None:
+            return list(best.get(task_id, ()))
+        return list(max(best.values(), key=self._chain_key, default=()))
+
+    def _chain_key(self, chain):
+        due_dates = [self.due_dates[task_id] for task_id in chain if task_id in self.due_dates]
+        return len(chain), sorted(due_dates, reverse=True)
+
+
+def graph_key(team):
+    """Return the cache key of the team's dependency graph for its current revision"""
+
+    return f'dependency_graph:{team.id}:{team.revision}:{team.revised_at.timestamp()}'
+
+
+def dependency_graph(team):
+    """Return the team's dependency graph, loading it only once per team revision"""
+
+    key = graph_key(team)
+    graph = cache.get(key)
+    if graph is None:
+        graph = DependencyGraph.load(team)
+        cache.set(key, graph, GRAPH_TIMEOUT)
+    return graph
+
+
+def check_dependencies(task, dependencies):
+    """Raise ValidationError if the task depending on the given tasks would create a cycle"""
+
+    dependency_ids = {dependency.pk for dependency in dependencies}
+    if task.pk is None or not dependency_ids:
+        return
+    if task.pk not in dependency_ids and not DependencyClosure.objects.filter(task__in=dependency_ids, blocker=task.pk).exists():
+        return
+    # Only load the graph to describe the cycle found. A cycle runs through
+    # tasks depending on the task, which may belong to other teams
+    graph = DependencyGraph(
+        Task.objects.filter(Q(pk=task.pk) | Q(pk__in=transitive_dependents(task).values('pk')))
+        .order_by('id').values_list('id', 'name', 'due_date', 'dependencies')
+    )
+    cycle = graph.find_cycle(task.pk, dependency_ids)
+    if cycle is None:
+        raise ValidationError('These dependencies would create a cycle.')
+    names = ' -> '.join(graph.names.get(task_id, str(task_id)) for task_id in cycle)
+    raise ValidationError(f'These dependencies would create a cycle: {names}.')
+
+
+def transitive_blockers(task):
+    """Return a query set of every task the task depends on, directly or through other tasks"""
+
+    return Task.objects.filter(closure_dependents__task=task)
+
+
+def transitive_dependents(task):
+    """Return a query set of every task depending on the task, directly or through other tasks"""
+
+    return Task.objects.filter(closure_blockers__blocker=task)
+
+
+def _closure(task_ids, depends_on, known=None):
+    """Return the set of blockers of each task, following depends_on and taking known blockers as given"""
+
+    known = known or {}
+    blockers = {}
+    for task_id in task_ids:
+        found = set()
+        stack = list(depends_on.get(task_id, ()))
+        while stack:
+            blocker_id = stack.pop()
+            if blocker_id in found:
+                continue
+            found.add(blocker_id)
+            if blocker_id in known:
+                found |= known[blocker_id]
+            else:
+                stack.extend(depends_on.get(blocker_id, ()))
+        blockers[task_id] = found
+    return blockers
+
+
+def _insert_closure(blockers):
+    DependencyClosure.objects.bulk_create([
+        DependencyClosure(task_id=task_id, blocker_id=blocker_id)
+        for task_id in sorted(blockers) for blocker_id in sorted(blockers[task_id])
+    ], batch_size=1000)
+
+
+def refresh_closure(task_ids):
+    """Bring the closure rows of the given tasks, and of every task depending on them, up to date
+
+    Called whenever the dependencies of those tasks change. Only the rows
+    of the affected tasks are rewritten; the blockers of the tasks they
+    depend on are read from the table as they stand."""
+
+    task_ids = set(task_ids)
+    if not task_ids:
+        return
+    with transaction.atomic():
+        affected = task_ids | set(
+            DependencyClosure.objects.filter(blocker__in=task_ids).values_list('task_id', flat=True)
+        )
+        depends_on = defaultdict(list)
+        for task_id, dependency_id in Task.dependencies.through.objects.filter(
+            from_task_id__in=affected
+        ).values_list('from_task_id', 'to_task_id'):
+            depends_on[task_id].append(dependency_id)
+
+        outside = {dependency_id for ids in depends_on.values() for dependency_id in ids} - affected
+        known = {task_id: set() for task_id in outside}
+        for task_id, blocker_id in DependencyClosure.objects.filter(task__in=outside).values_list('task_id', 'blocker_id'):
+            known[task_id].add(blocker_id)
+        DependencyClosure.objects.filter(task__in=affected).delete()
+        _insert_closure(_closure(affected, depends_on, known))
+
+
+def expected_closure():
+    """Return the blockers of every task with dependencies, worked out from the dependencies themselves"""
+
+    depends_on = defaultdict(list)
+    for task_id, dependency_id in Task.dependencies.through.objects.values_list('from_task_id', 'to_task_id'):
+        depends_on[task_id].append(dependency_id)
+    return _closure(depends_on, depends_on)
+
+
+def rebuild_closure():
+    """Rebuild the whole closure table from the dependencies and return how many rows it holds"""
+
+    blockers = expected_closure()
+    with transaction.atomic():
+        DependencyClosure.objects.all().delete()
+        _insert_closure(blockers)
+    return sum(len(ids) for ids in blockers.values())
+
+
+def verify_closure():
+    """Return the (missing, extra) (task id, blocker id) pairs of the closure table"""
+
+    expected = {(task_id, blocker_id) for task_id, ids in expected_closure().items() for blocker_id in ids}
+    actual = set(DependencyClosure.objects.values_list('task_id', 'blocker_id'))
+    return sorted(expected - actual), sorted(actual - expected)
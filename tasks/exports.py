@@ -0,0 +1,52 @@
+"""Streaming exports of task search results."""
+import csv
+import json
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_COLUMNS = ['id', 'name', 'description', 'priority', 'due_date', 'lane', 'team', 'assignees']
+
+
+class _Echo:
+    """File-like object whose write hands back what was written, so csv.writer output can be yielded"""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(tasks, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one dictionary of EXPORT_COLUMNS per task, fetching the tasks a chunk at a time"""
+
+    tasks = tasks.select_related('lane', 'assigned_team').prefetch_related('assigned_users')
+    for task in tasks.iterator(chunk_size=chunk_size):
+        yield {
+            'id': task.id,
+            'name': task.name,
+            'description': task.description,
+            'priority': task.get_priority_display(),
+            'due_date': task.due_date.isoformat(),
+            'lane': task.lane.lane_name,
+            'team': task.assigned_team.team_name,
+            'assignees': ' '.join(user.username for user in task.assigned_users.all()),
+        }
+
+
+def stream_csv(tasks):
+    """Yield the tasks as lines of CSV, starting with a header"""
+
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in export_rows(tasks):
+        yield writer.writerow([row[column] for column in EXPORT_COLUMNS])
+
+
+def stream_jsonl(tasks):
+    """Yield the tasks as JSON Lines, one object per task"""
+
+    for row in export_rows(tasks):
+        yield json.dumps(row) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', stream_csv),
+    'jsonl': ('application/x-ndjson', stream_jsonl),
+}
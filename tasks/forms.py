@@ -4,6 +4,7 @@ from django.contrib.auth import authenticate
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 from .models import User, Task, Team, Invite, Lane
+from .dependencies import check_dependencies
 from django.utils import timezone
 from datetime import datetime,timedelta
 from datetime import time as tm
@@ -133,6 +134,13 @@ class TaskForm(forms.ModelForm):
     
     dependencies = forms.ModelMultipleChoiceField(queryset = Task.objects.all(),required=False)
 
+    # Priorities are chosen by name, and stored as the matching Task.Priority
+    priority = forms.ChoiceField(
+        choices=[(priority.name.lower(), priority.label) for priority in Task.Priority],
+        initial='medium',
+        widget=forms.Select(attrs={'class': 'priorityClass'}),
+    )
+
     date_field = forms.DateField(
         label='Date',
         widget=forms.SelectDateWidget(),
@@ -158,6 +166,11 @@ class TaskForm(forms.ModelForm):
                 self.fields['dependencies'].queryset = Task.objects.filter(assigned_team=team)
         else:
             self.fields['dependencies'].queryset = Task.objects.filter(assigned_team=instance.assigned_team).exclude(id=instance.id)
+            self.initial['priority'] = Task.Priority(instance.priority).name.lower()
+
+    def clean_priority(self):
+        """Turn the chosen priority name into the value stored on the task"""
+        return Task.Priority[self.cleaned_data['priority'].upper()]
         
     def clean(self):
         """Cleans the date and time fields within the form and combines them into the datetime field within task"""
@@ -173,6 +186,12 @@ class TaskForm(forms.ModelForm):
                 cleaned_data['due_date'] = datetime.combine(date, time)
             else:
                 self.add_error("date_field", 'Pick a date-time in the future!')
+        dependencies = cleaned_data.get('dependencies')
+        if self.instance.pk is not None and dependencies:
+            try:
+                check_dependencies(self.instance, dependencies)
+            except ValidationError as error:
+                self.add_error('dependencies', error)
         return cleaned_data
     
     def save(self, assigned_team_id=None, lane_id=None, commit=True):
@@ -285,7 +304,7 @@ class InviteForm(forms.ModelForm):
             invite_message=self.cleaned_data.get("invite_message"),
             inviting_team=inviting_team,
         )
-        invite.set_invited_users(users)
+        self.unknown_usernames = invite.set_invited_users(users)
 
         return invite
 
@@ -357,4 +376,3 @@ class AssignTaskForm(forms.Form):
 
         assigned_users = self.cleaned_data.get("team_members")
         self.task.set_assigned_users(assigned_users)
-        self.task.save()
@@ -0,0 +1,281 @@
+"""Bulk imports of tasks from CSV or JSON Lines, in the columns that exports are written in."""
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .dependencies import refresh_closure
+from .models import Lane, Task, Team
+from .revisions import bump_team_revisions
+from .search import index_new_tasks
+
+DEFAULT_CHUNK_SIZE = 500
+# Task names cannot hold commas, so they separate the names of dependencies
+DEPENDENCY_SEPARATOR = ','
+# Priorities can be given by label, as exports write them, or by value
+PRIORITIES = {
+    **{label.lower(): value for value, label in Task.Priority.choices},
+    **{str(value): value for value in Task.Priority.values},
+}
+
+
+def read_csv(lines):
+    """Yield (line number, row) pairs from CSV with a header"""
+
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_jsonl(lines):
+    """Yield (line number, row) pairs from JSON Lines, with None for lines that are not JSON"""
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+IMPORT_FORMATS = {
+    'csv': read_csv,
+    'jsonl': read_jsonl,
+}
+
+
+def _text(value):
+    """Return a cell as stripped text, whichever format it came from"""
+
+    return '' if value is None else str(value).strip()
+
+
+def _names(value, separator=None):
+    """Return the distinct names in a cell, given either as a list or as text split on the separator"""
+
+    names = value if isinstance(value, list) else _text(value).split(separator)
+    return list(dict.fromkeys(_text(name) for name in names if _text(name)))
+
+
+class TaskImporter:
+    """Imports rows of tasks a chunk at a time
+
+    Teams are named by their team name, lanes by their name within the
+    team, assignees by username and dependencies by the name of a task in
+    the same team, either already saved or on an earlier row. Names are
+    looked up once per chunk for all of its rows, and each chunk is
+    inserted with bulk_create in its own transaction. bulk_create sends
+    no signals, so the search index, the dependency closure and the team
+    revisions are brought up to date alongside. Rows that break the
+    rules of Task are skipped and recorded in errors."""
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, team=None):
+        self.chunk_size = chunk_size
+        self.default_team = team
+        self.imported = 0
+        self.errors = []
+        self._teams = {}
+        self._lanes = {}
+        self._members = {}
+
+    def import_rows(self, rows):
+        """Import (line number, row) pairs, yielding how many tasks each chunk created"""
+
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            yield self.import_chunk(chunk)
+
+    def import_chunk(self, chunk):
+        """Validate and insert one chunk of (line number, row) pairs and return how many tasks were created"""
+
+        rows = []
+        for line, row in chunk:
+            if isinstance(row, dict):
+                rows.append((line, row))
+            else:
+                self.errors.append((line, 'Each row must be an object of columns.'))
+
+        team_ids = self._load_teams({_text(row.get('team')) for _, row in rows})
+        self._load_team_contents(team_ids)
+        existing = self._existing_tasks(team_ids, {
+            name for _, row in rows for name in _names(row.get('dependencies'), DEPENDENCY_SEPARATOR)
+        })
+
+        new_tasks = []
+        earlier = defaultdict(list)
+        for line, row in rows:
+            try:
+                task, assignee_ids, dependencies = self._build(row, existing, earlier)
+            except ValidationError as error:
+                self.errors.append((line, '; '.join(
+                    f'{field}: {message}' for field, messages in error.message_dict.items() for message in messages
+                )))
+            else:
+                new_tasks.append((task, assignee_ids, dependencies))
+                earlier[task.assigned_team_id, task.name].append(task)
+
+        self._insert(new_tasks)
+        self.imported += len(new_tasks)
+        return len(new_tasks)
+
+    def _load_teams(self, names):
+        """Look up the teams with any of the names not seen before, and return the ids of every team named"""
+
+        unseen = {name for name in names if name and name not in self._teams}
+        if unseen:
+            for name in unseen:
+                self._teams[name] = []
+            for team_id, name in Team.objects.filter(team_name__in=unseen).values_list('id', 'team_name'):
+                self._teams[name].append(team_id)
+
+        team_ids = {team_id for name in names for team_id in self._teams.get(name, ())}
+        if self.default_team is not None:
+            team_ids.add(self.default_team.id)
+        return team_ids
+
+    def _load_team_contents(self, team_ids):
+        """Look up the lanes and members of the teams not seen before"""
+
+        unseen = set(team_ids) - set(self._lanes)
+        if not unseen:
+            return
+        for team_id in unseen:
+            self._lanes[team_id] = {}
+            self._members[team_id] = {}
+        # Lanes go in board order, so the first lane of a team comes first
+        for team_id, lane_name, lane_id in Lane.objects.filter(team_id__in=unseen).order_by(
+            'lane_order', 'id'
+        ).values_list('team_id', 'lane_name', 'id'):
+            self._lanes[team_id].setdefault(lane_name, lane_id)
+        for team_id, username, user_id in Team.team_members.through.objects.filter(
+            team_id__in=unseen
+        ).values_list('team_id', 'user__username', 'user_id'):
+            self._members[team_id][username] = user_id
+
+    def _existing_tasks(self, team_ids, names):
+        """Return the ids of the saved tasks of the teams with any of the names, by team id and name"""
+
+        existing = defaultdict(list)
+        if team_ids and names:
+            for team_id, name, task_id in Task.objects.filter(
+                assigned_team_id__in=team_ids, name__in=names
+            ).values_list('assigned_team_id', 'name', 'id'):
+                existing[team_id, name].append(task_id)
+        return existing
+
+    def _team_id(self, row):
+        """Return the id of the team a row names, or raise ValidationError"""
+
+        name = _text(row.get('team'))
+        if not name:
+            if self.default_team is None:
+                raise ValidationError('Enter the name of a team.')
+            return self.default_team.id
+        team_ids = self._teams.get(name, [])
+        if not team_ids:
+            raise ValidationError(f'There is no team called "{name}".')
+        if len(team_ids) > 1:
+            raise ValidationError(f'More than one team is called "{name}".')
+        return team_ids[0]
+
+    def _build(self, row, existing, earlier):
+        """Return the unsaved task a row describes with its assignee ids and dependencies, or raise ValidationError
+
+        Dependencies are the ids of saved tasks or the unsaved tasks of earlier rows."""
+
+        errors = {}
+        fields = {
+            'name': _text(row.get('name')),
+            'description': _text(row.get('description')),
+            'priority': PRIORITIES.get(_text(row.get('priority')).lower() or str(Task.Priority.MEDIUM)),
+            'lane_id': None,
+            'assigned_team_id': None,
+        }
+        if fields['priority'] is None:
+            errors['priority'] = [f'Enter one of {", ".join(Task.Priority.labels)}.']
+
+        try:
+            due_date = parse_datetime(_text(row.get('due_date')))
+        except ValueError:
+            due_date = None
+        if due_date is None:
+            errors['due_date'] = ['Enter a valid date and time.']
+        else:
+            fields['due_date'] = due_date if timezone.is_aware(due_date) else timezone.make_aware(due_date)
+
+        assignee_ids = []
+        dependencies = []
+        try:
+            team_id = self._team_id(row)
+        except ValidationError as error:
+            errors['team'] = error.messages
+        else:
+            fields['assigned_team_id'] = team_id
+            lanes = self._lanes[team_id]
+            lane_name = _text(row.get('lane'))
+            fields['lane_id'] = lanes.get(lane_name) if lane_name else next(iter(lanes.values()), None)
+            if fields['lane_id'] is None:
+                errors['lane'] = [f'The team has no lane called "{lane_name}".' if lane_name else 'The team has no lanes.']
+
+            members = self._members[team_id]
+            usernames = _names(row.get('assignees'))
+            strangers = [username for username in usernames if username not in members]
+            if strangers:
+                errors['assignees'] = [f'These users are not members of the team: {", ".join(strangers)}.']
+            assignee_ids = [members[username] for username in usernames if username in members]
+
+            missing = []
+            ambiguous = []
+            for name in _names(row.get('dependencies'), DEPENDENCY_SEPARATOR):
+                matches = existing.get((team_id, name), []) + earlier.get((team_id, name), [])
+                if not matches:
+                    missing.append(name)
+                elif len(matches) > 1:
+                    ambiguous.append(name)
+                else:
+                    dependencies.append(matches[0])
+            if missing:
+                errors['dependencies'] = [f'The team has no task called: {", ".join(missing)}.']
+            if ambiguous:
+                errors.setdefault('dependencies', []).append(
+                    f'More than one task in the team is called: {", ".join(ambiguous)}.'
+                )
+
+        task = Task(**fields)
+        try:
+            task.full_clean(exclude=['lane', 'assigned_team', *errors])
+        except ValidationError as error:
+            errors.update(error.message_dict)
+        if errors:
+            raise ValidationError(errors)
+        return task, assignee_ids, dependencies
+
+    def _insert(self, new_tasks):
+        """Insert the tasks of a chunk with their assignees and dependencies in one transaction"""
+
+        if not new_tasks:
+            return
+        tasks = [task for task, _, _ in new_tasks]
+        assignments = Task.assigned_users.through
+        links = Task.dependencies.through
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            assignments.objects.bulk_create([
+                assignments(task_id=task.pk, user_id=user_id)
+                for task, assignee_ids, _ in new_tasks for user_id in assignee_ids
+            ])
+            links.objects.bulk_create([
+                links(from_task_id=task.pk, to_task_id=getattr(dependency, 'pk', dependency))
+                for task, _, dependencies in new_tasks for dependency in dependencies
+            ])
+            index_new_tasks(tasks)
+            # New tasks have no dependents yet, so only their own closure rows are needed
+            refresh_closure(task.pk for task, _, dependencies in new_tasks if dependencies)
+            bump_team_revisions(task.assigned_team_id for task in tasks)
@@ -0,0 +1,53 @@
+"""Clearing out invites that have expired, kept off the request path."""
+from contextlib import contextmanager
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.utils import timezone
+from .models import Invite, InviteNotification
+from .notifications import invalidate_notification_counts, recipient_ids
+from .revisions import bump_team_revisions
+from .signals import bump_revision_on_invite_change, invalidate_notification_counts_on_invite_delete
+
+DEFAULT_BATCH_SIZE = 500
+# Receivers doing per invite what the purge does once per batch
+PURGED_INVITE_RECEIVERS = [
+    (pre_delete, invalidate_notification_counts_on_invite_delete),
+    (post_delete, bump_revision_on_invite_change),
+]
+
+
+@contextmanager
+def _without_invite_receivers():
+    """Disconnect the receivers of deleted invites for the duration, connecting them again after"""
+
+    for signal, receiver in PURGED_INVITE_RECEIVERS:
+        signal.disconnect(receiver, sender=Invite)
+    try:
+        yield
+    finally:
+        for signal, receiver in PURGED_INVITE_RECEIVERS:
+            signal.connect(receiver, sender=Invite)
+
+
+def purge_expired_invites(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """Delete expired invites with their notifications in batches and return how many were deleted
+
+    Each batch is deleted in its own transaction, so no single statement
+    or lock grows with the number of expired invites."""
+
+    now = now or timezone.now()
+    purged = 0
+    while True:
+        batch = list(Invite.objects.filter(expires_at__lte=now).order_by('id').values_list('id', 'inviting_team_id')[:batch_size])
+        if not batch:
+            break
+        invite_ids = [invite_id for invite_id, _ in batch]
+        with transaction.atomic(), _without_invite_receivers():
+            notifications = InviteNotification.objects.filter(invite_id__in=invite_ids)
+            invalidate_notification_counts(recipient_ids(notifications))
+            # Deleting the notifications first keeps them from being loaded again, field by field, by the cascade
+            notifications.delete()
+            Invite.objects.filter(id__in=invite_ids).delete()
+            bump_team_revisions(team_id for _, team_id in batch)
+        purged += len(batch)
+    return purged
@@ -0,0 +1,81 @@
+from random import Random
+from time import perf_counter
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from django.urls import reverse
+from tasks.autocomplete import INDEX_VERSION_KEY, username_index
+from tasks.models import User, Team
+from tasks.views import autocomplete_user
+
+SYLLABLES = ['an', 'bo', 'ca', 'de', 'el', 'fi', 'ga', 'ho', 'is', 'jo', 'ka', 'li', 'mo', 'ne', 'or', 'pe', 'ra', 'si', 'tu', 'vi']
+
+class Command(BaseCommand):
+    """Build automation command to benchmark user autocomplete by replaying typing sessions."""
+
+    help = 'Times autocomplete keystrokes against LIKE filtering as the number of users grows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, nargs='+', default=[10000, 100000], help='Numbers of users to try')
+        parser.add_argument('--sessions', type=int, default=20, help='Typing sessions replayed per scenario')
+
+    def handle(self, *args, **options):
+        """Run every scenario, rolling back after each one."""
+
+        self.stdout.write(f"{'users':>10} {'keystrokes':>11} {'build (s)':>10} {'like (ms)':>10} {'cold (ms)':>10} {'warm (ms)':>10}")
+        for user_count in options['users']:
+            results = self.run_scenario(user_count, options['sessions'])
+            self.stdout.write('{:>10} {:>11} {:>10.4f} {:>10.4f} {:>10.4f} {:>10.4f}'.format(user_count, *results))
+
+    def run_scenario(self, user_count, session_count):
+        """Seed throwaway users, then time each keystroke of some typing sessions."""
+
+        random = Random(user_count)
+        with transaction.atomic():
+            usernames = {'@' + ''.join(random.choices(SYLLABLES, k=random.randint(2, 6))) for _ in range(user_count)}
+            users = User.objects.bulk_create((
+                User(username=username, email=f'{username[1:]}@example.org', password='!')
+                for username in usernames
+            ), batch_size=1000)
+            team = Team.objects.create(team_name='Benchmark', team_creator=users[0])
+            team.team_members.add(users[0])
+
+            # Users made by bulk_create send no signals, so start a fresh index
+            cache.clear()
+            start = perf_counter()
+            username_index()
+            build_seconds = perf_counter() - start
+
+            queries = []
+            for username in random.sample(sorted(usernames), session_count):
+                typed = [username[:length] for length in range(2, len(username) + 1)]
+                # Each session deletes back over what was typed before finishing it
+                queries += typed + typed[-2:len(typed) // 2:-1] + typed[len(typed) // 2 + 1:]
+
+            like_seconds = self.time(lambda query: list(
+                User.objects.exclude(team=team).filter(username__icontains=query).values_list('username', flat=True)
+            ), queries)
+            requests = [self.request(users[0], team, query) for query in queries]
+            cold_seconds = self.time(autocomplete_user, requests)
+            warm_seconds = self.time(autocomplete_user, requests)
+            transaction.set_rollback(True)
+
+        cache.delete(INDEX_VERSION_KEY)
+        return len(queries), build_seconds, like_seconds * 1000, cold_seconds * 1000, warm_seconds * 1000
+
+    def request(self, user, team, query):
+        """Return an autocomplete request from the user for the query."""
+
+        request = RequestFactory().get(reverse('autocomplete_user'), {'q': query})
+        request.user = user
+        request.session = {'current_team_id': team.id}
+        return request
+
+    def time(self, keystroke, inputs):
+        """Return the average time one keystroke takes."""
+
+        start = perf_counter()
+        for value in inputs:
+            keystroke(value)
+        return (perf_counter() - start) / len(inputs)
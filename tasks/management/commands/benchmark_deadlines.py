@@ -0,0 +1,62 @@
+from datetime import timedelta
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from tasks.deadlines import sweep_deadlines
+from tasks.models import User, Team, Lane, Task, TaskNotification
+from tasks.notifications import bulk_send_notifications
+
+class Command(BaseCommand):
+    """Build automation command to benchmark the deadline notification engine."""
+
+    help = 'Times the deadline sweeper as the number of due tasks and existing notifications grows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--members', type=int, default=10, help='Number of members in the benchmark team')
+        parser.add_argument('--due-tasks', type=int, nargs='+', default=[50, 100, 200], help='Numbers of due tasks to try')
+        parser.add_argument('--inbox-sizes', type=int, nargs='+', default=[0, 2000, 10000], help='Numbers of existing notifications to try')
+
+    def handle(self, *args, **options):
+        """Run every combination of due tasks and inbox size, rolling back after each one."""
+
+        self.stdout.write(f"{'due tasks':>10} {'notifications':>14} {'queries':>8} {'seconds':>9}")
+        for inbox_size in options['inbox_sizes']:
+            for due_count in options['due_tasks']:
+                queries, seconds = self.run_scenario(options['members'], due_count, inbox_size)
+                self.stdout.write(f'{due_count:>10} {inbox_size:>14} {queries:>8} {seconds:>9.4f}')
+
+    def run_scenario(self, member_count, due_count, inbox_size):
+        """Seed a throwaway team, sweep it and report the query count and time taken."""
+
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(username=f'@benchmark{number}', email=f'benchmark{number}@example.org', password='!')
+                for number in range(member_count)
+            ])
+            team = Team.objects.create(team_name='Benchmark', team_creator=users[0])
+            Team.team_members.through.objects.bulk_create([
+                Team.team_members.through(team_id=team.id, user_id=user.id) for user in users
+            ])
+            lane = Lane.objects.create(lane_name='Benchmark', team=team)
+
+            yesterday = timezone.now().date() - timedelta(days=1)
+            soon = timezone.now() + timedelta(days=2)
+            later = timezone.now() + timedelta(days=60)
+            filler_task = Task.objects.create(name='Filler', due_date=later, deadline_notif_sent=later.date(), lane=lane, assigned_team=team)
+            Task.objects.bulk_create([
+                Task(name=f'Due {number}', due_date=soon, deadline_notif_sent=yesterday, lane=lane, assigned_team=team)
+                for number in range(due_count)
+            ])
+            bulk_send_notifications(
+                (users[number % member_count].id, TaskNotification(task=filler_task))
+                for number in range(inbox_size)
+            )
+
+            with CaptureQueriesContext(connection) as queries:
+                start = perf_counter()
+                sweep_deadlines(team=team)
+                seconds = perf_counter() - start
+            transaction.set_rollback(True)
+        return len(queries), seconds
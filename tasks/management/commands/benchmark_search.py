@@ -0,0 +1,66 @@
+from datetime import timedelta
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from tasks.models import User, Team, Lane, Task
+from tasks.search import fts_available, rebuild_index, search_tasks
+
+WORDS = ['design', 'review', 'deploy', 'refactor', 'report', 'meeting', 'budget', 'testing', 'release', 'planning']
+
+class Command(BaseCommand):
+    """Build automation command to compare full-text search with LIKE filtering."""
+
+    help = 'Times task search through the full-text index against LIKE as the number of tasks grows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, nargs='+', default=[10000, 100000], help='Numbers of tasks to try')
+        parser.add_argument('--queries', nargs='+', default=['deploy', 'task 4242'], help='Search queries to time')
+        parser.add_argument('--repeat', type=int, default=5, help='Searches timed per scenario')
+
+    def handle(self, *args, **options):
+        """Run every scenario, rolling back after each one."""
+
+        if not fts_available():
+            raise CommandError('The full-text search index is only available on SQLite with FTS5.')
+
+        self.stdout.write(f"{'tasks':>10} {'query':>12} {'matches':>8} {'like (s)':>9} {'fts (s)':>9}")
+        for task_count in options['tasks']:
+            for query, matches, like_seconds, fts_seconds in self.run_scenario(task_count, options['queries'], options['repeat']):
+                self.stdout.write(f'{task_count:>10} {query:>12} {matches:>8} {like_seconds:>9.4f} {fts_seconds:>9.4f}')
+
+    def run_scenario(self, task_count, queries, repeat):
+        """Seed throwaway tasks and time both ways of searching them for each query."""
+
+        with transaction.atomic():
+            user = User.objects.create(username='@benchmark', email='benchmark@example.org', password='!')
+            team = Team.objects.create(team_name='Benchmark', team_creator=user)
+            lane = Lane.objects.create(lane_name='Benchmark', team=team)
+            due_date = timezone.now() + timedelta(days=30)
+            Task.objects.bulk_create((
+                Task(
+                    name=f'{WORDS[number % len(WORDS)]} {number}',
+                    description=f'{WORDS[(number * 7) % len(WORDS)]} notes for task {number}',
+                    due_date=due_date, lane=lane, assigned_team=team
+                )
+                for number in range(task_count)
+            ), batch_size=1000)
+            rebuild_index()
+
+            results = []
+            for query in queries:
+                like = Task.objects.filter(name__icontains=query) | Task.objects.filter(description__icontains=query)
+                like_seconds = self.time(lambda: list(like.values_list('id', flat=True)), repeat)
+                fts = search_tasks(Task.objects.all(), query)
+                fts_seconds = self.time(lambda: list(fts.values_list('id', flat=True)), repeat)
+                results.append((query, fts.count(), like_seconds, fts_seconds))
+            transaction.set_rollback(True)
+        return results
+
+    def time(self, search, repeat):
+        """Return the average time one search takes."""
+
+        start = perf_counter()
+        for _ in range(repeat):
+            search()
+        return (perf_counter() - start) / repeat
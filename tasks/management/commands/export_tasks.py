@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.http import QueryDict
+from tasks.exports import EXPORT_FORMATS
+from tasks.search import FACETS, SEARCH_SORT_COLUMNS, order_tasks, search_from_params
+
+class Command(BaseCommand):
+    """Build automation command to export the tasks matching a search."""
+
+    help = 'Writes the tasks matching a search as CSV or JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv', help='Output format')
+        parser.add_argument('--output', help='File to write to instead of standard output')
+        parser.add_argument('--q', default='', help='Search query, as typed into the search page')
+        parser.add_argument('--sort-column', choices=SEARCH_SORT_COLUMNS, help='Column to sort by')
+        parser.add_argument('--sort-direction', choices=['asc', 'desc'], default='asc', help='Sort direction')
+        for facet in FACETS:
+            parser.add_argument(f'--{facet}', help=f'Only export tasks with this {facet} facet value')
+
+    def handle(self, *args, **options):
+        """Build the same query parameters as the search page and stream the matching tasks."""
+
+        params = QueryDict(mutable=True)
+        params['q'] = options['q']
+        if options['sort_column']:
+            params['sort_column'] = options['sort_column']
+            params['sort_direction'] = options['sort_direction']
+        for facet in FACETS:
+            if options[facet] is not None:
+                params[facet] = options[facet]
+
+        tasks, sort_field, descending = search_from_params(params)
+        tasks, _ = order_tasks(tasks, sort_field, descending)
+        _, stream = EXPORT_FORMATS[options['format']]
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                output.writelines(stream(tasks))
+        else:
+            for chunk in stream(tasks):
+                self.stdout.write(chunk, ending='')
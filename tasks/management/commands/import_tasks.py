@@ -0,0 +1,53 @@
+import os
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from tasks.imports import DEFAULT_CHUNK_SIZE, IMPORT_FORMATS, TaskImporter
+from tasks.models import Team
+
+class Command(BaseCommand):
+    """Build automation command to import tasks in bulk from CSV or JSON Lines."""
+
+    help = 'Imports tasks from a CSV or JSON Lines file in chunks, naming teams, lanes, assignees and dependencies'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, in the columns that export_tasks writes plus dependencies')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Input format, if not given by the file extension')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows validated and inserted per transaction')
+        parser.add_argument('--team', type=int, help='Id of the team for rows that do not name one')
+
+    def handle(self, *args, **options):
+        """Stream the file through the importer, reporting progress after each chunk."""
+
+        input_format = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if input_format not in IMPORT_FORMATS:
+            raise CommandError(f'Cannot tell the format of {options["path"]}; give it with --format.')
+        if options['chunk_size'] < 1:
+            raise CommandError('The chunk size must be at least 1.')
+        team = None
+        if options['team'] is not None:
+            team = Team.objects.filter(pk=options['team']).first()
+            if team is None:
+                raise CommandError(f'There is no team with id {options["team"]}.')
+
+        importer = TaskImporter(chunk_size=options['chunk_size'], team=team)
+        start = perf_counter()
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as lines:
+                for created in importer.import_rows(IMPORT_FORMATS[input_format](lines)):
+                    self.stdout.write(f'Imported {created} tasks ({importer.imported} so far, {self.rate(importer, start):.0f} tasks/s)')
+        except OSError as error:
+            raise CommandError(f'Cannot read {options["path"]}: {error.strerror}.')
+
+        for line, message in importer.errors:
+            self.stderr.write(f'Line {line}: {message}')
+        seconds = perf_counter() - start
+        self.stdout.write(
+            f'Imported {importer.imported} tasks and skipped {len(importer.errors)} rows '
+            f'in {seconds:.2f}s ({self.rate(importer, start):.0f} tasks/s).'
+        )
+
+    def rate(self, importer, start):
+        """Return how many tasks have been imported per second since the start."""
+
+        seconds = perf_counter() - start
+        return importer.imported / seconds if seconds else 0
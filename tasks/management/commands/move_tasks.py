@@ -0,0 +1,25 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from tasks.board import move_tasks
+from tasks.models import Lane
+
+class Command(BaseCommand):
+    """Build automation command to move many tasks into one lane at once."""
+
+    help = 'Moves the given tasks into a lane of the same team'
+
+    def add_arguments(self, parser):
+        parser.add_argument('lane', type=int, help='Id of the lane to move the tasks into')
+        parser.add_argument('tasks', type=int, nargs='+', help='Ids of the tasks to move')
+
+    def handle(self, *args, **options):
+        """Move the tasks, leaving them all in place if any belongs to another team."""
+
+        lane = Lane.objects.select_related('team').filter(pk=options['lane']).first()
+        if lane is None:
+            raise CommandError(f"Lane {options['lane']} does not exist.")
+        try:
+            moved = move_tasks(lane.team, options['tasks'], lane.id)
+        except ValidationError as error:
+            raise CommandError(' '.join(error.messages))
+        self.stdout.write(f'Moved {len(moved)} task(s) to {lane.lane_name}.')
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from tasks.invites import DEFAULT_BATCH_SIZE, purge_expired_invites
+
+class Command(BaseCommand):
+    """Build automation command to delete expired invites and their notifications."""
+
+    help = 'Deletes expired invites, their invited users and their notifications in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Number of invites deleted per batch')
+        parser.add_argument('--loop', action='store_true', help='Keep purging until interrupted')
+        parser.add_argument('--interval', type=int, default=3600, help='Seconds to wait between purges when looping')
+
+    def handle(self, *args, **options):
+        """Purge once, or repeatedly when running as a local worker."""
+
+        while True:
+            purged = purge_expired_invites(batch_size=options['batch_size'])
+            self.stdout.write(f'Purged {purged} expired invite(s).')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from tasks.board import rebalance_lanes
+from tasks.models import Team
+
+class Command(BaseCommand):
+    """Build automation command to respace the lanes of every team's board."""
+
+    help = 'Spreads the lanes of each board evenly apart again, keeping their order'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--team', type=int, help='Only rebalance the team with this id')
+
+    def handle(self, *args, **options):
+        """Rebalance the boards one team at a time."""
+
+        teams = Team.objects.filter(lanes__isnull=False).distinct()
+        if options['team'] is not None:
+            teams = teams.filter(pk=options['team'])
+        count = 0
+        for team in teams.iterator():
+            rebalance_lanes(team)
+            count += 1
+        self.stdout.write(f'Rebalanced lanes for {count} team(s).')
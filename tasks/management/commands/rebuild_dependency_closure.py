@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from tasks.dependencies import rebuild_closure, verify_closure
+
+class Command(BaseCommand):
+    """Build automation command to rebuild or verify the task dependency closure table."""
+
+    help = 'Rebuilds the transitive dependency table from task dependencies, or checks it with --verify'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true', help='Only report rows that are missing or should not be there')
+
+    def handle(self, *args, **options):
+        """Refill the table, or compare it with the dependencies without changing it."""
+
+        if not options['verify']:
+            rows = rebuild_closure()
+            self.stdout.write(f'Recorded {rows} transitive dependencies.')
+            return
+
+        missing, extra = verify_closure()
+        for task_id, blocker_id in missing:
+            self.stdout.write(f'Missing: task {task_id} depends on task {blocker_id}')
+        for task_id, blocker_id in extra:
+            self.stdout.write(f'Extra: task {task_id} does not depend on task {blocker_id}')
+        if missing or extra:
+            raise CommandError(f'The dependency closure has {len(missing)} missing and {len(extra)} extra row(s).')
+        self.stdout.write('The dependency closure is up to date.')
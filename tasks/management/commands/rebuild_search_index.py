@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+from tasks.search import fts_available, rebuild_index
+
+class Command(BaseCommand):
+    """Build automation command to rebuild the task full-text search index."""
+
+    help = 'Rebuilds the full-text search index from the tasks in the database'
+
+    def handle(self, *args, **options):
+        """Refill the index, which only exists on SQLite databases."""
+
+        if not fts_available():
+            raise CommandError('The full-text search index is only available on SQLite with FTS5.')
+        indexed = rebuild_index()
+        self.stdout.write(f'Indexed {indexed} task(s).')
@@ -3,6 +3,7 @@ from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from datetime import timedelta
 from django.utils import timezone
+from tasks.board import LANE_ORDER_GAP
 from tasks.models import User, Team, Task, Lane
 
 import pytz
@@ -188,7 +189,7 @@ class Command(BaseCommand):
             name = name[:50]
             lane = Lane.objects.create(
                 lane_name=name,
-                lane_order=order_number,
+                lane_order=order_number * LANE_ORDER_GAP,
                 team=team
             )
             return lane
@@ -235,7 +236,7 @@ class Command(BaseCommand):
             description=self.faker.paragraph()
             description = description[:200]
             due_date = self.faker.date_time_this_decade(after_now=True, before_now=False, tzinfo=timezone.utc) + timedelta(days=100)
-            task_priority = self.faker.random_element(['low', 'medium', 'high'])
+            task_priority = self.faker.random_element(list(Task.Priority))
             
             task = Task.objects.create(
                 name=name,
@@ -267,15 +268,13 @@ class Command(BaseCommand):
         
     def set_dependencies_for_tasks(self, tasks):
         all_tasks = list(tasks)
-        for task in all_tasks:
-            exclude_current = all_tasks.copy()
-            exclude_current.remove(task)
+        for position, task in enumerate(all_tasks):
+            # Only depend on earlier tasks, so the dependencies never form a cycle
+            earlier_tasks = all_tasks[:position]
             
-            if exclude_current:
-                dependencies = self.faker.random_elements(exclude_current, length=self.faker.pyint(min_value=0,max_value=len(exclude_current)-1), unique=True)
-                for x in dependencies:
-                    if x not in task.dependencies.all():
-                        task.dependencies.add(x)
+            if earlier_tasks:
+                dependencies = self.faker.random_elements(earlier_tasks, length=self.faker.pyint(min_value=0,max_value=len(earlier_tasks)-1), unique=True)
+                task.dependencies.add(*dependencies)
 
 def create_username(first_name, last_name):
     return '@' + first_name.lower() + last_name.lower()
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from tasks.deadlines import DEFAULT_BATCH_SIZE, sweep_deadlines
+
+class Command(BaseCommand):
+    """Build automation command to send and refresh deadline notifications."""
+
+    help = 'Sends deadline notifications for tasks that are due soon'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Number of tasks processed per batch')
+        parser.add_argument('--loop', action='store_true', help='Keep sweeping until interrupted')
+        parser.add_argument('--interval', type=int, default=3600, help='Seconds to wait between sweeps when looping')
+
+    def handle(self, *args, **options):
+        """Sweep once, or repeatedly when running as a local worker."""
+
+        while True:
+            processed = sweep_deadlines(batch_size=options['batch_size'])
+            self.stdout.write(f'Processed deadlines for {processed} task(s).')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
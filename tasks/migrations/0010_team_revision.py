@@ -0,0 +1,24 @@
+# Generated by Django 4.2.6 on 2026-10-18 00:49
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_notification_is_read'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='revised_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='revision',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.6 on 2026-10-18 00:59
+
+from django.db import migrations, models
+
+PRIORITY_VALUES = {'low': '1', 'medium': '2', 'high': '3'}
+
+
+def priority_names_to_numbers(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    for name, number in PRIORITY_VALUES.items():
+        Task.objects.filter(priority=name).update(priority=number)
+
+
+def priority_numbers_to_names(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    for name, number in PRIORITY_VALUES.items():
+        Task.objects.filter(priority=number).update(priority=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_task_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(priority_names_to_numbers, priority_numbers_to_names),
+        migrations.AlterField(
+            model_name='task',
+            name='priority',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Low'), (2, 'Medium'), (3, 'High')], default=2),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['priority', 'id'], name='task_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['due_date', 'id'], name='task_due_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_team', 'priority', 'due_date'], name='task_team_priority_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_team', 'due_date'], name='task_team_due_date_idx'),
+        ),
+    ]
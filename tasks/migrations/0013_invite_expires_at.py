@@ -0,0 +1,19 @@
+# Generated by Django 4.2.6 on 2026-10-18 01:18
+
+from django.db import migrations, models
+import tasks.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_task_priority_integer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invite',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True, default=tasks.models.invite_expiry),
+        ),
+    ]
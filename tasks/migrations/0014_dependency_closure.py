@@ -0,0 +1,47 @@
+# Generated by Django 4.2.6 on 2026-10-18 01:25
+
+from collections import defaultdict
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_closure(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    DependencyClosure = apps.get_model('tasks', 'DependencyClosure')
+    depends_on = defaultdict(list)
+    for task_id, dependency_id in Task.dependencies.through.objects.values_list('from_task_id', 'to_task_id'):
+        depends_on[task_id].append(dependency_id)
+
+    rows = []
+    for task_id in depends_on:
+        blockers = set()
+        stack = list(depends_on[task_id])
+        while stack:
+            blocker_id = stack.pop()
+            if blocker_id not in blockers:
+                blockers.add(blocker_id)
+                stack.extend(depends_on.get(blocker_id, ()))
+        rows += [DependencyClosure(task_id=task_id, blocker_id=blocker_id) for blocker_id in blockers]
+    DependencyClosure.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_invite_expires_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DependencyClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('blocker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='closure_dependents', to='tasks.task')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='closure_blockers', to='tasks.task')),
+            ],
+            options={
+                'unique_together': {('task', 'blocker')},
+            },
+        ),
+        migrations.RunPython(fill_closure, migrations.RunPython.noop),
+    ]
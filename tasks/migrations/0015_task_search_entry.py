@@ -0,0 +1,28 @@
+# Generated by Django 4.2.6 on 2026-10-18 01:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+import tasks.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0014_dependency_closure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskSearchEntry',
+            fields=[
+                ('task', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='tasks.task')),
+                ('name', models.TextField()),
+                ('description', models.TextField()),
+                ('document', tasks.models.FullTextField(db_column='tasks_task_fts')),
+            ],
+            options={
+                'db_table': 'tasks_task_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -2,7 +2,7 @@ from collections.abc import Collection
 from django.core.validators import RegexValidator, MaxLengthValidator, MinValueValidator
 from django.core.exceptions import ValidationError 
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 from libgravatar import Gravatar
 from datetime import datetime, timezone, timedelta
 from django.utils import timezone
@@ -81,11 +81,25 @@ class Team(models.Model):
     team_creator = models.ForeignKey(User, on_delete=models.CASCADE, blank=False, related_name="created_teams")
     team_members = models.ManyToManyField(User, blank=True)
     description = models.TextField(blank=True, validators=[MaxLengthValidator(200)])
+    revision = models.PositiveIntegerField(default=0, editable=False)
+    revised_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    REVISION_FIELDS = ('revision', 'revised_at')
     
     def __str__(self):
         """Overrides string to show the team's name"""
     
         return self.team_name
+
+    def save(self, *args, **kwargs):
+        """Save the team without writing back its revision, which only bump_team_revisions changes"""
+
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.REVISION_FIELDS
+            ]
+        super().save(*args, **kwargs)
         
     def add_invited_member(self, user):
         """Add a new team member from an invite"""
@@ -120,29 +134,47 @@ class Team(models.Model):
 
         return self.task_set.all()
 
+def invite_expiry():
+    """Return when an invite sent now expires"""
+
+    return timezone.now() + Invite.LIFETIME
+
 class Invite(models.Model):
     """Model used to hold information about invites"""
 
+    LIFETIME = timedelta(days=14)
+
     invited_users = models.ManyToManyField(User, blank=False)
     inviting_team = models.ForeignKey(Team, on_delete=models.CASCADE, default=None, blank=False)
     invite_message = models.TextField(validators=[MaxLengthValidator(100)], blank=True)
     status = models.CharField(max_length=30, default="Reject")
+    expires_at = models.DateTimeField(default=invite_expiry, db_index=True)
 
     def clean(self):
         super().clean()
 
     def set_invited_users(self, users):
-        """Set the invited users of the invite"""
+        """Invite the users named in a space separated string, returning the names not found
 
-        users_list = users.split(" ")
+        The users are looked up, invited and notified in a fixed number of
+        queries however many are named."""
 
-        for username in users_list:
-            user = User.objects.get(username=username)
-            self.invited_users.add(user)
-            self.save()
-            notif = InviteNotification.objects.create(invite=self)
-            user.add_notification(notif)
-        self.save()
+        from .notifications import bulk_send_notifications
+        from .revisions import bump_team_revisions
+
+        usernames = list(dict.fromkeys(username for username in users.split(" ") if username))
+        found = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+        already_invited = set(self.invited_users.filter(id__in=found.values()).values_list('id', flat=True))
+        new_ids = [found[username] for username in usernames if username in found and found[username] not in already_invited]
+
+        with transaction.atomic():
+            Invite.invited_users.through.objects.bulk_create([
+                Invite.invited_users.through(invite_id=self.id, user_id=user_id) for user_id in new_ids
+            ])
+            bulk_send_notifications((user_id, InviteNotification(invite=self)) for user_id in new_ids)
+            if new_ids:
+                bump_team_revisions([self.inviting_team_id])
+        return [username for username in usernames if username not in found]
 
     def set_team(self, team):
         """Set the team that will send the invite"""
@@ -150,6 +182,11 @@ class Invite(models.Model):
         self.inviting_team = team
         self.save()
 
+    def has_expired(self):
+        """Return whether the invite can no longer be accepted"""
+
+        return self.expires_at <= timezone.now()
+
     def get_inviting_team(self):
         """Return the inviting team"""
 
@@ -159,13 +196,15 @@ class Invite(models.Model):
         """Closes the invite and perform relevant behavior for
             when the invite has been accepted/rejected """
 
+        from .notifications import invalidate_notification_counts
+
         if user_to_invite:
             if self.status == "Accept":
                 self.get_inviting_team().add_invited_member(user_to_invite) 
             self.invited_users.remove(user_to_invite)  
-            notifs = user_to_invite.get_notifications()
-            notif = list(filter(lambda notif: notif.as_invite_notif() != None and notif.as_invite_notif().invite == self, notifs))[0]
-            notif.delete()
+            # Found through the indexed invite and recipient links, whatever the size of the inbox
+            InviteNotification.objects.filter(invite=self, user=user_to_invite).delete()
+            invalidate_notification_counts([user_to_invite.id])
             self.save()
         if self.invited_users.count() == 0:
             self.delete()
@@ -201,15 +240,13 @@ class Task(models.Model):
         message='Enter a valid word with at least 3 alphanumeric characters (no special characters allowed).',
         code='invalid_word',
     )
-    priority = models.CharField(
-        max_length=10,
-        choices=[
-            ('low', 'Low'),
-            ('medium', 'Medium'),
-            ('high', 'High'),
-        ],
-        default='medium',
-    )
+    class Priority(models.IntegerChoices):
+        """Priorities are stored as small integers so that sorting by them can use an index"""
+        LOW = 1, 'Low'
+        MEDIUM = 2, 'Medium'
+        HIGH = 3, 'High'
+
+    priority = models.PositiveSmallIntegerField(choices=Priority.choices, default=Priority.MEDIUM)
     name = models.CharField(max_length=30, blank=False, validators=[alphanumeric])
     description = models.CharField(max_length=530, blank=True)
     due_date = models.DateTimeField(default=timezone.now, validators=[MinValueValidator(limit_value=timezone.now(), message='Datetime must be in the future.')], blank=False)
@@ -220,57 +257,119 @@ class Task(models.Model):
     dependencies = models.ManyToManyField("Task",blank=True)
     deadline_notif_sent = models.DateField(default=(datetime.today()-timedelta(days=1)).date())
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['priority', 'id'], name='task_priority_idx'),
+            models.Index(fields=['due_date', 'id'], name='task_due_date_idx'),
+            models.Index(fields=['assigned_team', 'priority', 'due_date'], name='task_team_priority_due_idx'),
+            models.Index(fields=['assigned_team', 'due_date'], name='task_team_due_date_idx'),
+        ]
+
     def get_assigned_users(self):
         """Return all users assigned to this task"""
 
         return self.assigned_users.all()
 
     def set_assigned_users(self, assigned_users):
-        """Set the assigned users of the task"""
-       
-        self.assigned_users.clear() # Reset the assigned users
-
-        # Reassign users
-        for user in assigned_users:
-            self.assigned_users.add(user)
+        """Set the assigned users of the task, notifying only those newly assigned
+
+        The new users are compared with the current ones, and only the
+        difference is inserted or deleted, in bulk. The task is saved once."""
+
+        from .notifications import bulk_send_notifications
+
+        assignments = Task.assigned_users.through
+        new_ids = {user.pk for user in assigned_users}
+        with transaction.atomic():
+            current_ids = set(assignments.objects.filter(task_id=self.pk).values_list('user_id', flat=True))
+            added_ids = sorted(new_ids - current_ids)
+            removed_ids = current_ids - new_ids
+            if removed_ids:
+                assignments.objects.filter(task_id=self.pk, user_id__in=removed_ids).delete()
+            assignments.objects.bulk_create([assignments(task_id=self.pk, user_id=user_id) for user_id in added_ids])
+            bulk_send_notifications(
+                (user_id, TaskNotification(task=self, notification_type=TaskNotification.NotificationType.ASSIGNMENT))
+                for user_id in added_ids
+            )
             self.save()
-            notif = TaskNotification.objects.create(task=self, notification_type="AS")
-            user.add_notification(notif)
 
     def notify_keydates(self):
-        """Configures the deadline notifications for the task based on the current date"""
-        if datetime.today().date() < (self.due_date-timedelta(days=5)).date() and self.deadline_notif_sent != (self.due_date-timedelta(days=5)).date():
-            for user in self.assigned_team.team_members.all():
-                current_notifs = list(filter(lambda notif: notif.as_task_notif() != None and notif.as_task_notif().task == self and notif.as_task_notif().notification_type=="DL",user.get_notifications()))
-                if len(current_notifs)>0:
-                    current_notifs[0].delete()
-                else:
-                    break
-            self.deadline_notif_sent = (self.due_date-timedelta(days=5)).date()
-        if self.deadline_notif_sent < datetime.today().date():
-            for user in self.assigned_team.team_members.all():
-                current_notifs = list(filter(lambda notif: notif.as_task_notif() != None and notif.as_task_notif().task == self and notif.as_task_notif().notification_type=="DL",user.get_notifications()))
-                if len(current_notifs)>0:
-                    current_notifs[0].delete()
-                self.deadline_notif_sent=datetime.today().date()
-                notif_to_add = TaskNotification.objects.create(task=self,notification_type="DL")
-                user.add_notification(notif_to_add) 
-        self.save()
+        """Configures the deadline notifications for the task based on the current date
+
+        The new deadline_notif_sent date is saved by refresh_deadline_notifications."""
+        from .deadlines import refresh_deadline_notifications
+
+        refresh_deadline_notifications([self])
 
     def set_dependencies(self,new_dependencies):
-        """Discards the previous dependencies and sets the new dependencies for a task"""
-        self.dependencies.clear()
-        for task in new_dependencies.all():
-            self.dependencies.add(task)
-            self.save()
+        """Discards the previous dependencies and sets the new dependencies for a task
+
+        Raises ValidationError, changing nothing, if the new dependencies would create a cycle."""
+        from .dependencies import check_dependencies
+
+        new_dependencies = list(new_dependencies)
+        check_dependencies(self, new_dependencies)
+        self.dependencies.set(new_dependencies)
 
     def __str__(self):
         return self.name
 
 
+class DependencyClosure(models.Model):
+    """Model recording that a task depends on another, directly or through other tasks"""
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='closure_blockers')
+    blocker = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='closure_dependents')
+
+    class Meta:
+        """Model options."""
+
+        unique_together = ('task', 'blocker')
+
+
+class FullTextField(models.TextField):
+    """Field for the hidden column of an FTS5 table, which is named after the table and matched against"""
+
+
+@FullTextField.register_lookup
+class FullTextMatch(models.Lookup):
+    """Lookup matching an FTS5 table against a full-text query"""
+
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class TaskSearchEntry(models.Model):
+    """Model for a task's row in the SQLite FTS5 full-text index, which tasks.search keeps up to date
+
+    The table is a virtual table made by a migration on SQLite only, so
+    Django does not manage it and nothing else refers to it."""
+
+    task = models.OneToOneField(
+        Task, primary_key=True, db_column='rowid', on_delete=models.DO_NOTHING, related_name='search_entry'
+    )
+    name = models.TextField()
+    description = models.TextField()
+    document = FullTextField(db_column='tasks_task_fts')
+
+    class Meta:
+        """Model options."""
+
+        managed = False
+        db_table = 'tasks_task_fts'
+
+
 class Notification(models.Model): 
     """Generic template model for notifications"""
 
+    kind = "generic"
+
+    is_read = models.BooleanField(default=False)
+
     def as_task_notif(self):
         """Return notification as instance of TaskNotification"""
         try:
@@ -292,6 +391,8 @@ class Notification(models.Model):
 class TaskNotification(Notification): 
     """Model used to represent a notification relating to a specific task"""
 
+    kind = "task"
+
     class NotificationType(models.TextChoices):
         """Acts as an enum within the model"""
         ASSIGNMENT = "AS"
@@ -312,6 +413,8 @@ class TaskNotification(Notification):
 
 class InviteNotification(Notification): 
     """Model used to represent a notification relating to a team invite"""
+
+    kind = "invite"
     invite = models.ForeignKey(Invite,blank=False,on_delete=models.CASCADE)
 
     def display(self):
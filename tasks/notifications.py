@@ -0,0 +1,164 @@
+"""Loading and bulk operations on notifications."""
+from collections import defaultdict
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Prefetch, Q
+from .models import Notification, User, TaskNotification, InviteNotification
+
+MENU_FEED_SIZE = 10
+INBOX_PAGE_SIZE = 20
+COUNTS_TIMEOUT = 300
+
+
+def _insert_child_rows(model, notifications):
+    """Insert the child table rows of already created notifications
+
+    Django's bulk_create refuses multi-table inherited models, so the child
+    rows are written with a single executemany once their parents exist."""
+
+    fields = model._meta.local_concrete_fields
+    quote_name = connection.ops.quote_name
+    sql = 'INSERT INTO %s (%s) VALUES (%s)' % (
+        quote_name(model._meta.db_table),
+        ', '.join(quote_name(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    rows = [
+        [field.get_db_prep_save(getattr(notification, field.attname), connection) for field in fields]
+        for notification in notifications
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def bulk_send_notifications(recipients_and_notifications):
+    """Save (user id, unsaved notification) pairs and deliver them in a fixed number of queries
+
+    The notifications may be any mix of Notification subclasses. They are
+    returned saved, in the order they were given."""
+
+    pairs = list(recipients_and_notifications)
+    if not pairs:
+        return []
+
+    parent_fields = [field for field in Notification._meta.concrete_fields if not field.primary_key]
+    with transaction.atomic():
+        parents = Notification.objects.bulk_create([
+            Notification(**{field.attname: getattr(notification, field.attname) for field in parent_fields})
+            for _, notification in pairs
+        ])
+
+        notifications_by_model = defaultdict(list)
+        for parent, (_, notification) in zip(parents, pairs):
+            setattr(notification, Notification._meta.pk.attname, parent.pk)
+            notification.pk = parent.pk
+            notification._state.adding = False
+            notifications_by_model[type(notification)].append(notification)
+        for model, notifications in notifications_by_model.items():
+            if model is not Notification:
+                _insert_child_rows(model, notifications)
+
+        User.notifications.through.objects.bulk_create([
+            User.notifications.through(user_id=user_id, notification_id=notification.pk)
+            for user_id, notification in pairs
+        ])
+    invalidate_notification_counts({user_id for user_id, _ in pairs})
+    return [notification for _, notification in pairs]
+
+
+def _counts_key(user_id):
+    return f'notification_counts:{user_id}'
+
+
+def notification_counts(user):
+    """Return the user's unread and total notification counts, cached between requests"""
+
+    key = _counts_key(user.id)
+    counts = cache.get(key)
+    if counts is None:
+        counts = user.notifications.aggregate(
+            unread=Count('id', filter=Q(is_read=False)),
+            total=Count('id'),
+        )
+        cache.set(key, counts, COUNTS_TIMEOUT)
+    return counts
+
+
+def invalidate_notification_counts(user_ids):
+    """Forget the cached notification counts of the given users"""
+
+    cache.delete_many([_counts_key(user_id) for user_id in user_ids])
+
+
+def recipient_ids(notifications):
+    """Return the ids of the users who received any of the given notifications"""
+
+    return set(
+        User.notifications.through.objects.filter(notification__in=notifications).values_list('user_id', flat=True)
+    )
+
+
+def feed_queryset(user, team_id=None):
+    """Return a query set of the notifications shown in the user's feed, newest first
+
+    Task notifications are limited to the given team, matching what the menu
+    shows while that team's dashboard is selected."""
+
+    notifications = user.notifications.order_by('-id')
+    if team_id is not None:
+        notifications = notifications.filter(
+            Q(tasknotification__isnull=True) | Q(tasknotification__task__assigned_team_id=team_id)
+        )
+    return notifications
+
+
+def resolve_notifications(notifications):
+    """Return the concrete TaskNotification/InviteNotification for each notification
+
+    Each notification type is loaded with one query, together with the task,
+    invite, team and team creator its display needs, so the result renders
+    without any further queries."""
+
+    notifications = notifications.prefetch_related(
+        Prefetch('tasknotification', queryset=TaskNotification.objects.select_related('task__assigned_team')),
+        Prefetch('invitenotification', queryset=InviteNotification.objects.select_related('invite__inviting_team__team_creator')),
+    )
+    return [
+        notification.as_task_notif() or notification.as_invite_notif() or notification
+        for notification in notifications
+    ]
+
+
+def load_notification_feed(user, team_id=None, limit=None):
+    """Return the user's feed of notifications with their concrete types resolved"""
+
+    notifications = feed_queryset(user, team_id)
+    if limit is not None:
+        notifications = notifications[:limit]
+    return resolve_notifications(notifications)
+
+
+def load_inbox_page(user, before=None, page_size=INBOX_PAGE_SIZE):
+    """Return one page of the user's inbox and the cursor of the next page
+
+    Pages are keyed on the notification id rather than an offset, so every
+    page costs the same however deep into the inbox it is. The cursor is
+    None on the last page."""
+
+    notifications = feed_queryset(user)
+    if before is not None:
+        notifications = notifications.filter(id__lt=before)
+    page = resolve_notifications(notifications[:page_size + 1])
+    if len(page) > page_size:
+        page = page[:page_size]
+        return page, page[-1].id
+    return page, None
+
+
+def mark_read(user, notifications):
+    """Mark the given notifications of the user as read"""
+
+    unread_ids = [notification.id for notification in notifications if not notification.is_read]
+    if unread_ids:
+        Notification.objects.filter(id__in=unread_ids).update(is_read=True)
+        invalidate_notification_counts([user.id])
@@ -0,0 +1,43 @@
+"""Per-team revision stamps and the board fragments cached against them."""
+from django.core.cache import cache
+from django.db.models import F
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from .models import Team
+
+FRAGMENT_TIMEOUT = 3600
+CSRF_PLACEHOLDER = 'board-fragment-csrf-token'
+
+
+def bump_team_revisions(team_ids):
+    """Mark the boards of the given teams as changed with a single UPDATE"""
+
+    team_ids = {team_id for team_id in team_ids if team_id is not None}
+    if team_ids:
+        Team.objects.filter(pk__in=team_ids).update(revision=F('revision') + 1, revised_at=timezone.now())
+
+
+def fragment_key(name, team, *vary):
+    """Return the cache key of a board fragment for the team's current revision"""
+
+    parts = ['board_fragment', name, team.id, team.revision, team.revised_at.timestamp(), *vary]
+    return ':'.join(str(part) for part in parts)
+
+
+def render_fragment(request, template_name, context, team, vary=()):
+    """Render part of the team's board, reusing the copy cached for its current revision
+
+    CSRF tokens belong to a session, so fragments are cached with a
+    placeholder that is swapped for the requesting user's token."""
+
+    if team is None:
+        return render_to_string(template_name, context, request)
+
+    key = fragment_key(template_name, team, *vary)
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(template_name, {**context, 'csrf_token': CSRF_PLACEHOLDER})
+        cache.set(key, html, FRAGMENT_TIMEOUT)
+    return mark_safe(html.replace(CSRF_PLACEHOLDER, get_token(request)))
@@ -0,0 +1,263 @@
+"""Full-text search over task names and descriptions, backed by SQLite FTS5 where available."""
+import re
+from datetime import datetime
+from django.core import signing
+from django.db import connection
+from django.db.models import Case, CharField, Count, F, FloatField, Func, IntegerField, Q, Value, When
+from django.utils import timezone
+from .board import unfinished_dependencies
+from .models import Task, TaskSearchEntry
+
+FTS_TABLE = TaskSearchEntry._meta.db_table
+# Matches in a task's name count for more than matches in its description
+NAME_WEIGHT = 10.0
+SEARCH_PAGE_SIZE = 25
+SEARCH_SORT_COLUMNS = ('due_date', 'priority')
+# Facets that search results can be narrowed by, with their titles
+FACETS = {
+    'priority': 'Priority',
+    'lane': 'Lane',
+    'team': 'Team',
+    'assignee': 'Assignee',
+    'overdue': 'Overdue',
+}
+
+
+def fts_available():
+    """Return whether the full-text index exists on the current database
+
+    Once the table has been seen the answer is remembered on the connection."""
+
+    if connection.vendor != 'sqlite':
+        return False
+    if not getattr(connection, 'tasks_fts_available', False):
+        connection.tasks_fts_available = FTS_TABLE in connection.introspection.table_names()
+    return connection.tasks_fts_available
+
+
+def index_task(task, created=False):
+    """Add the task to the full-text index, replacing any earlier entry
+
+    An existing entry that already holds the task's name and description
+    is left alone, since rewriting an FTS row is far dearer than reading it."""
+
+    if not fts_available():
+        return
+    if not created:
+        indexed = TaskSearchEntry.objects.filter(pk=task.pk).values_list('name', 'description').first()
+        if indexed == (task.name, task.description):
+            return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [task.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)',
+            [task.pk, task.name, task.description]
+        )
+
+
+def index_new_tasks(tasks):
+    """Add tasks that have never been indexed, such as those made by bulk_create, with one statement"""
+
+    if fts_available():
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)',
+                [(task.pk, task.name, task.description) for task in tasks]
+            )
+
+
+def unindex_task(task_id):
+    """Remove a task from the full-text index"""
+
+    if fts_available():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [task_id])
+
+
+def rebuild_index():
+    """Rebuild the whole full-text index from the task table and return how many tasks it holds"""
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(f'INSERT INTO {FTS_TABLE} (rowid, name, description) SELECT id, name, description FROM tasks_task')
+        return cursor.rowcount
+
+
+def match_expression(query):
+    """Turn free text into an FTS5 query where every word must match the start of a token"""
+
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_tasks(tasks, query):
+    """Filter a query set of tasks down to those whose name or description match the query
+
+    With the full-text index the matches are ranked best first and carry
+    their search_rank, where lower is better. Otherwise they are matched
+    with LIKE."""
+
+    expression = match_expression(query)
+    if not expression or not fts_available():
+        return tasks.filter(Q(name__icontains=query) | Q(description__icontains=query))
+
+    # The index is joined once, so it is matched and ranked in one pass over its matches
+    return tasks.filter(search_entry__document__match=expression).annotate(
+        search_rank=Func(
+            F('search_entry__document'), Value(NAME_WEIGHT), Value(1.0), function='bm25', output_field=FloatField()
+        )
+    ).order_by('search_rank', 'id')
+
+
+def encode_cursor(value, task_id):
+    """Return an opaque cursor pointing just past a task with the given sort value"""
+
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return signing.dumps([value, task_id], salt='task_search')
+
+
+def decode_cursor(cursor):
+    """Return the (sort value, task id) held in a cursor, or None if it is missing or invalid"""
+
+    if not cursor:
+        return None
+    try:
+        value, task_id = signing.loads(cursor, salt='task_search')
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    return value, task_id
+
+
+def search_from_params(params):
+    """Return the (tasks, sort field, descending) asked for by task search query parameters
+
+    Only the known sort columns are accepted, since each page carries on
+    from the sort value of the last one."""
+
+    tasks = Task.objects.all()
+    q = params.get('q', '')
+    if q:
+        tasks = search_tasks(tasks, q)
+    tasks = filter_by_facets(tasks, params)
+
+    sort_column = params.get('sort_column')
+    if sort_column not in SEARCH_SORT_COLUMNS:
+        return tasks, None, False
+    return tasks, sort_column, params.get('sort_direction') == 'desc'
+
+
+def order_tasks(tasks, sort_field=None, descending=False):
+    """Order tasks by sort_field and then id, returning the tasks and the field used
+
+    Without a sort_field, ranked search results stay in rank order and
+    anything else is ordered by id."""
+
+    if sort_field is None:
+        sort_field = 'search_rank' if 'search_rank' in tasks.query.annotations else 'id'
+    if sort_field == 'id':
+        return tasks.order_by('-id' if descending else 'id'), sort_field
+    # Ties are always broken by ascending id, whichever way the sort column runs
+    return tasks.order_by('-' + sort_field if descending else sort_field, 'id'), sort_field
+
+
+def paginate_tasks(tasks, sort_field=None, descending=False, after=None, page_size=SEARCH_PAGE_SIZE):
+    """Return one page of tasks after the given cursor, and the cursor of the next page
+
+    Tasks are ordered as by order_tasks. Each page starts where the previous
+    one ended rather than at an offset, so every page costs the same
+    whatever its position. The team and assignees shown for each task are
+    loaded with the page."""
+
+    tasks, sort_field = order_tasks(tasks, sort_field, descending)
+    position = decode_cursor(after)
+    if position is not None:
+        value, task_id = position
+        direction = 'lt' if descending else 'gt'
+        if sort_field == 'id':
+            tasks = tasks.filter(**{f'id__{direction}': task_id})
+        else:
+            tasks = tasks.filter(
+                Q(**{f'{sort_field}__{direction}': value}) | Q(**{sort_field: value, 'id__gt': task_id})
+            )
+
+    page = list(tasks.select_related('assigned_team').prefetch_related('assigned_users')[:page_size + 1])
+    next_cursor = None
+    if len(page) > page_size:
+        page = page[:page_size]
+        last = page[-1]
+        next_cursor = encode_cursor(getattr(last, sort_field), last.id)
+    return page, next_cursor
+
+
+def filter_by_facets(tasks, selected):
+    """Narrow tasks down to the facet values selected, ignoring any that are not whole numbers
+
+    Tasks can also be narrowed down to those that are blocked by an
+    unfinished dependency, or those that are not."""
+
+    lookups = {
+        'priority': 'priority',
+        'lane': 'lane_id',
+        'team': 'assigned_team_id',
+        'assignee': 'assigned_users',
+    }
+    for facet, lookup in lookups.items():
+        value = selected.get(facet)
+        if value and value.isdigit():
+            tasks = tasks.filter(**{lookup: int(value)})
+
+    blocked = selected.get('blocked')
+    if blocked == 'true':
+        tasks = tasks.filter(unfinished_dependencies())
+    elif blocked == 'false':
+        tasks = tasks.exclude(unfinished_dependencies())
+
+    overdue = selected.get('overdue')
+    if overdue == '1':
+        tasks = tasks.filter(due_date__lt=timezone.now())
+    elif overdue == '0':
+        tasks = tasks.filter(due_date__gte=timezone.now())
+    return tasks
+
+
+def facet_counts(tasks):
+    """Return, for every facet, the (value, label, count) of each value found among the tasks
+
+    All facets are counted by one statement: a grouped count per facet,
+    joined with UNION ALL."""
+
+    overdue = Case(When(due_date__lt=timezone.now(), then=Value(1)), default=Value(0), output_field=IntegerField())
+    no_label = Value('', output_field=CharField())
+    keys = {
+        'priority': (F('priority'), no_label),
+        'lane': (F('lane_id'), F('lane__lane_name')),
+        'team': (F('assigned_team_id'), F('assigned_team__team_name')),
+        'assignee': (F('assigned_users__id'), F('assigned_users__username')),
+        'overdue': (overdue, no_label),
+    }
+    base = tasks.order_by()
+    grouped = [
+        base.annotate(
+            facet=Value(facet, output_field=CharField()),
+            key=key,
+            label=label,
+        ).values('facet', 'key', 'label').annotate(count=Count('id', distinct=True)).order_by()
+        for facet, (key, label) in keys.items()
+    ]
+    rows = grouped[0].union(*grouped[1:], all=True)
+
+    counts = {facet: [] for facet in FACETS}
+    for row in rows:
+        if row['key'] is None:
+            continue
+        if row['facet'] == 'priority':
+            label = Task.Priority(row['key']).label
+        elif row['facet'] == 'overdue':
+            label = 'Overdue' if row['key'] else 'Not overdue'
+        else:
+            label = row['label']
+        counts[row['facet']].append((row['key'], label, row['count']))
+    for values in counts.values():
+        values.sort(key=lambda value: (-value[2], str(value[1])))
+    return counts
@@ -1,7 +1,14 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import Team
+from .autocomplete import update_username_index
+from .dependencies import refresh_closure
+from .models import Invite, InviteNotification, Lane, Task, TaskNotification, Team
+from .notifications import invalidate_notification_counts, recipient_ids
+from .revisions import bump_team_revisions
+from .search import index_task, unindex_task
 
 
 # When a new user is made, this checks if the user is a super user and then creates a default team for them
@@ -31,4 +38,130 @@ def create_team_for_superuser(sender, instance, **kwargs):
                 team_creator=instance
             )
             team.add_invited_member(instance)
-            
+
+
+# When notifications are added to or removed from a user, their cached notification counts are dropped
+@receiver(m2m_changed, sender=get_user_model().notifications.through)
+def invalidate_notification_counts_on_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        if reverse:
+            invalidate_notification_counts(pk_set or [])
+        else:
+            invalidate_notification_counts([instance.pk])
+
+
+# Deleting a task or invite removes its notifications without any m2m signal, so their recipients' counts are dropped first
+@receiver(pre_delete, sender=Task)
+def invalidate_notification_counts_on_task_delete(sender, instance, **kwargs):
+    invalidate_notification_counts(recipient_ids(TaskNotification.objects.filter(task=instance)))
+
+
+@receiver(pre_delete, sender=Invite)
+def invalidate_notification_counts_on_invite_delete(sender, instance, **kwargs):
+    invalidate_notification_counts(recipient_ids(InviteNotification.objects.filter(invite=instance)))
+
+
+# Changes to anything a team's board shows move the team on to a new revision
+@receiver([post_save, post_delete], sender=Task)
+def bump_revision_on_task_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_team_revisions([instance.assigned_team_id])
+
+
+@receiver([post_save, post_delete], sender=Lane)
+def bump_revision_on_lane_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_team_revisions([instance.team_id])
+
+
+@receiver([post_save, post_delete], sender=Invite)
+def bump_revision_on_invite_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_team_revisions([instance.inviting_team_id])
+
+
+@receiver(post_save, sender=Team)
+def bump_revision_on_team_change(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        bump_team_revisions([instance.pk])
+
+
+@receiver(m2m_changed, sender=Team.team_members.through)
+def bump_revision_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove'):
+        bump_team_revisions(pk_set if reverse else [instance.pk])
+    elif action == 'pre_clear' and reverse:
+        bump_team_revisions(instance.team_set.values_list('id', flat=True))
+    elif action == 'post_clear' and not reverse:
+        bump_team_revisions([instance.pk])
+
+
+@receiver(m2m_changed, sender=Task.dependencies.through)
+def bump_revision_on_dependency_change(sender, instance, action, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        team_ids = {instance.assigned_team_id}
+        if pk_set:
+            team_ids.update(Task.objects.filter(pk__in=pk_set).values_list('assigned_team_id', flat=True))
+        bump_team_revisions(team_ids)
+
+
+# Team info shows usernames, so renaming a user changes the boards of their teams
+@receiver(post_save, sender=get_user_model())
+def bump_revision_on_user_change(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if created or raw or (update_fields is not None and 'username' not in update_fields):
+        return
+    bump_team_revisions(
+        Team.objects.filter(Q(team_members=instance) | Q(team_creator=instance)).values_list('id', flat=True)
+    )
+
+
+# Keep the full-text search index in step with task names and descriptions
+@receiver(post_save, sender=Task)
+def index_task_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not {'name', 'description'} & set(update_fields):
+        return
+    index_task(instance, created)
+
+
+@receiver(post_delete, sender=Task)
+def unindex_task_on_delete(sender, instance, **kwargs):
+    unindex_task(instance.pk)
+
+
+# Keep the dependency closure table in step with the dependencies of each task
+@receiver(m2m_changed, sender=Task.dependencies.through)
+def refresh_closure_on_dependency_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        refresh_closure([instance.pk])
+    elif reverse and action in ('post_add', 'post_remove'):
+        refresh_closure(pk_set)
+    elif reverse and action == 'pre_clear':
+        instance._closure_dependents = list(instance.task_set.values_list('id', flat=True))
+    elif reverse and action == 'post_clear':
+        refresh_closure(getattr(instance, '_closure_dependents', []))
+
+
+@receiver(pre_delete, sender=Task)
+def remember_dependents_on_task_delete(sender, instance, **kwargs):
+    instance._closure_dependents = list(
+        instance.closure_dependents.exclude(task=instance).values_list('task_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Task)
+def refresh_closure_on_task_delete(sender, instance, **kwargs):
+    refresh_closure(getattr(instance, '_closure_dependents', []))
+
+
+# Keep the username index used for autocomplete in step once a change to a user is committed
+@receiver(post_save, sender=get_user_model())
+def index_username_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or 'username' in update_fields:
+        user_id, username = instance.pk, instance.username
+        transaction.on_commit(lambda: update_username_index(user_id, username))
+
+
+@receiver(post_delete, sender=get_user_model())
+def unindex_username_on_delete(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: update_username_index(user_id))
@@ -3,7 +3,7 @@ from django import forms
 from django.test import TestCase
 from tasks.forms import TaskForm
 from tasks.models import Task, Lane, User, Team
-from datetime import date, time, timezone, datetime
+from datetime import date, time, timezone, datetime, timedelta
 from django.utils import timezone
 
 class TaskFormTestCase(TestCase):
@@ -125,3 +125,19 @@ class TaskFormTestCase(TestCase):
         self.assertTrue(form.is_valid)
         task2 = form.save(assigned_team_id=self.team.id)
         self.assertIn(self.task, task2.dependencies.all())
+
+    def test_priority_is_chosen_by_name_and_stored_as_a_number(self):
+        self.form_input['date_field'] = date.today() + timedelta(days=30)
+        self.form_input['priority'] = 'high'
+        form = TaskForm(data=self.form_input)
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['priority'], Task.Priority.HIGH)
+
+    def test_unknown_priority_is_rejected(self):
+        self.form_input['priority'] = 'urgent'
+        form = TaskForm(data=self.form_input)
+        self.assertFalse(form.is_valid())
+
+    def test_edit_form_shows_the_priority_name(self):
+        form = TaskForm(instance=self.task)
+        self.assertEqual(form.initial['priority'], 'medium')
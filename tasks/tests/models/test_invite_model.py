@@ -1,7 +1,9 @@
 """Unit tests for the Invite model."""
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
-from tasks.models import User, Team, Invite
+from django.test.utils import CaptureQueriesContext
+from tasks.models import User, Team, Invite, InviteNotification
 
 class InviteModelTestCase(TestCase):
     """Unit tests for the Invite model."""
@@ -64,6 +66,49 @@ class InviteModelTestCase(TestCase):
         with self.assertRaises(Invite.DoesNotExist):
             Invite.objects.get(pk=id) 
 
+    def test_set_invited_users_returns_unknown_usernames(self):
+        unknown = self.invite.set_invited_users("@johndoe @nobody @janedoe @someone")
+        self.assertEqual(unknown, ["@nobody", "@someone"])
+        self.assertEqual(self.invite.invited_users.count(), 3)
+        self.assertEqual(InviteNotification.objects.filter(invite=self.invite, user=self.user).count(), 1)
+
+    def test_set_invited_users_does_not_notify_twice(self):
+        self.invite.set_invited_users("@peterpickles")
+        self.assertEqual(InviteNotification.objects.filter(invite=self.invite).count(), 1)
+
+    def test_set_invited_users_takes_a_fixed_number_of_queries(self):
+        users = User.objects.bulk_create([
+            User(username=f'@invitee{number}', email=f'invitee{number}@example.org') for number in range(50)
+        ])
+        usernames = " ".join(user.username for user in users)
+        with self.assertNumQueries(11):
+            self.invite.set_invited_users(usernames)
+        self.assertEqual(self.invite.invited_users.count(), 51)
+        self.assertEqual(InviteNotification.objects.filter(invite=self.invite).count(), 51)
+
+    def test_close_deletes_only_the_users_invite_notification(self):
+        other_invite = Invite.objects.create(inviting_team=self.team)
+        other_invite.set_invited_users("@peterpickles")
+        self.invite.close(user_to_invite=self.other_user)
+        self.assertFalse(InviteNotification.objects.filter(invite=self.invite).exists())
+        self.assertTrue(InviteNotification.objects.filter(invite=other_invite, user=self.other_user).exists())
+
+    def test_close_without_a_notification_does_not_fail(self):
+        InviteNotification.objects.filter(invite=self.invite).delete()
+        self.invite.close(user_to_invite=self.other_user)
+        self.assertFalse(Invite.objects.filter(pk=self.invite.pk).exists())
+
+    def test_close_costs_the_same_whatever_the_inbox_size(self):
+        self.invite.set_invited_users("@janedoe @johndoe")
+        jane = User.objects.get(username="@janedoe")
+        for _ in range(20):
+            Invite.objects.create(inviting_team=self.team).set_invited_users("@peterpickles")
+        with CaptureQueriesContext(connection) as small_inbox:
+            self.invite.close(user_to_invite=jane)
+        with CaptureQueriesContext(connection) as large_inbox:
+            self.invite.close(user_to_invite=self.other_user)
+        self.assertEqual(len(large_inbox), len(small_inbox))
+
     def _assert_invite_is_valid(self):
         try:
             self.invite.full_clean()
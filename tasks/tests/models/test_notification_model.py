@@ -64,6 +64,7 @@ class TaskNotificationModelTestCase(TestCase):
 
     def test_notification_deleted_when_deadline_postponed(self):
         self.task.due_date = self.task.due_date + timedelta(days=1)
+        self.task.save()
         self.task.notify_keydates()
         new_notifs = [notif.as_task_notif() for notif in self.user.notifications.select_related("tasknotification")]
         new_deadline_notifs = list(filter(lambda notif: notif.notification_type==TaskNotification.NotificationType.DEADLINE,new_notifs))
@@ -74,6 +75,7 @@ class TaskNotificationModelTestCase(TestCase):
         self.assertEqual(self.task_notifs[1].notification_type,TaskNotification.NotificationType.DEADLINE)
         self.assertEqual(self.task_notifs[0].notification_type,TaskNotification.NotificationType.ASSIGNMENT)
         self.task.due_date = self.task.due_date - timedelta(days=1)
+        self.task.save()
         self.task.notify_keydates()
         new_notifs = [notif.as_task_notif() for notif in self.user.notifications.select_related("tasknotification")]
         new_deadline_notifs = list(filter(lambda notif: notif.notification_type==TaskNotification.NotificationType.DEADLINE,new_notifs))
@@ -86,6 +88,7 @@ class TaskNotificationModelTestCase(TestCase):
 
     def test_notification_shows_deadline_passed(self):
         self.task.due_date = timezone.make_aware(datetime.today(), self.timezone_utc)
+        self.task.save()
         self.task.notify_keydates()
         new_notifs = [notif.as_task_notif() for notif in self.user.notifications.select_related("tasknotification")]
         new_deadline_notifs = list(filter(lambda notif: notif.notification_type==TaskNotification.NotificationType.DEADLINE,new_notifs))
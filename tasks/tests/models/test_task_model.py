@@ -1,7 +1,7 @@
 """Unit tests for the Task model."""
 from django.core.exceptions import ValidationError
 from django.test import TestCase
-from tasks.models import Task, Lane, Team, User
+from tasks.models import Task, Lane, Team, User, TaskNotification
 from datetime import datetime, timedelta
 from django.utils import timezone
 import pytz
@@ -183,9 +183,32 @@ class TaskModelTestCase(TestCase):
     def test_changed_deadline_notif_sent(self):
         self.task.assigned_team.add_invited_member(self.user)
         self.task.due_date = timezone.make_aware((datetime.today()+timedelta(days=5)), self.timezone_utc)
+        self.task.save()
         self.task.notify_keydates()
         self.assertEqual(self.task.deadline_notif_sent,datetime.today().date())
         
+    def test_set_assigned_users_applies_only_the_difference(self):
+        self.task.set_assigned_users([self.user, self.user3])
+        self.assertEqual(set(self.task.assigned_users.all()), {self.user, self.user3})
+        self.task.set_assigned_users([self.user, self.user2])
+        self.assertEqual(set(self.task.assigned_users.all()), {self.user, self.user2})
+
+    def test_set_assigned_users_notifies_only_newly_assigned_users(self):
+        self.task.set_assigned_users([self.user3, self.user])
+        self.task.set_assigned_users([self.user3, self.user, self.user2])
+        assignments = TaskNotification.objects.filter(task=self.task, notification_type=TaskNotification.NotificationType.ASSIGNMENT)
+        self.assertEqual(assignments.filter(user=self.user).count(), 1)
+        self.assertEqual(assignments.filter(user=self.user2).count(), 1)
+        self.assertFalse(assignments.filter(user=self.user3).exists())
+
+    def test_set_assigned_users_takes_a_fixed_number_of_queries(self):
+        users = User.objects.bulk_create([
+            User(username=f'@assignee{number}', email=f'assignee{number}@example.org') for number in range(30)
+        ])
+        with self.assertNumQueries(13):
+            self.task.set_assigned_users(users)
+        self.assertEqual(self.task.assigned_users.count(), 30)
+
     # Assertions:
     
     def _assert_task_is_valid(self, task):
@@ -0,0 +1,137 @@
+"""Unit tests for the username index behind autocomplete."""
+from django.core.cache import cache
+from django.test import TestCase
+from tasks import autocomplete
+from tasks.autocomplete import INDEX_VERSION_KEY, UsernameIndex, suggest_invitees, suggest_usernames, username_index
+from tasks.models import Team, User
+
+
+class UsernameIndexTestCase(TestCase):
+    """Unit tests for looking up usernames in the index."""
+
+    def setUp(self):
+        self.index = UsernameIndex([
+            (1, '@johndoe'), (2, '@janedoe'), (3, '@petrapickles'), (4, '@PeterPan'), (5, '@doenut'),
+        ])
+
+    def test_prefix_matches_come_before_other_matches(self):
+        self.assertEqual(self.index.suggest('@doe'), ['@doenut'])
+        self.assertEqual(self.index.suggest('doe'), ['@doenut', '@janedoe', '@johndoe'])
+
+    def test_matching_ignores_case(self):
+        self.assertEqual(self.index.suggest('@pet'), ['@PeterPan', '@petrapickles'])
+        self.assertEqual(self.index.suggest('PICKLES'), ['@petrapickles'])
+
+    def test_suggestions_are_capped(self):
+        self.assertEqual(self.index.suggest('@', limit=2), ['@doenut', '@janedoe'])
+
+    def test_excluded_usernames_are_left_out(self):
+        self.assertEqual(self.index.suggest('doe', exclude=['@janedoe']), ['@doenut', '@johndoe'])
+
+    def test_each_username_is_suggested_once(self):
+        self.assertEqual(self.index.suggest('e'), ['@doenut', '@janedoe', '@johndoe', '@PeterPan', '@petrapickles'])
+
+    def test_added_and_removed_users_are_found_or_not(self):
+        self.index.add(6, '@doella')
+        self.index.add(1, '@johnny')
+        self.index.remove(5)
+        self.assertEqual(self.index.suggest('@do'), ['@doella'])
+        self.assertEqual(self.index.suggest('john'), ['@johnny'])
+
+    def test_separator_in_query_matches_nothing(self):
+        self.assertEqual(self.index.suggest('doe\n@j'), [])
+
+
+class UsernameIndexSignalsTestCase(TestCase):
+    """Tests for keeping the process's username index current."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.get(username='@johndoe')
+
+    def test_index_is_built_from_the_database(self):
+        self.assertIn('@johndoe', suggest_usernames('@john'))
+
+    def test_committed_changes_update_the_index_in_place(self):
+        index = username_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.username = '@johnsmith'
+            self.user.save()
+            User.objects.create_user('@johnny', first_name='Johnny', last_name='Doe', email='johnny@example.org')
+        self.assertIs(username_index(), index)
+        self.assertEqual(suggest_usernames('@john'), ['@johnny', '@johnsmith'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertEqual(suggest_usernames('@john'), ['@johnny'])
+
+    def test_saves_that_keep_the_username_leave_the_version(self):
+        username_index()
+        version = cache.get(INDEX_VERSION_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Johnny'
+            self.user.save()
+        self.assertEqual(cache.get(INDEX_VERSION_KEY), version)
+
+    def test_changes_made_elsewhere_are_replayed(self):
+        index = username_index()
+        version = cache.incr(INDEX_VERSION_KEY)
+        cache.set(f'{INDEX_VERSION_KEY}:{version}', (99, '@johnny'))
+        self.assertIs(username_index(), index)
+        self.assertIn('@johnny', suggest_usernames('@john'))
+
+    def test_a_version_taken_elsewhere_is_not_reused(self):
+        index = username_index()
+        version = cache.get(INDEX_VERSION_KEY)
+        # Another process logged its change under the next version before counting up to it
+        cache.set(f'{INDEX_VERSION_KEY}:{version + 1}', (99, '@johnny'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.username = '@johnsmith'
+            self.user.save()
+        self.assertEqual(cache.get(INDEX_VERSION_KEY), version + 2)
+        self.assertEqual(cache.get(f'{INDEX_VERSION_KEY}:{version + 1}'), (99, '@johnny'))
+        self.assertIs(username_index(), index)
+        self.assertEqual(suggest_usernames('@john'), ['@johnny', '@johnsmith'])
+
+    def test_index_is_rebuilt_when_changes_made_elsewhere_are_lost(self):
+        index = username_index()
+        cache.incr(INDEX_VERSION_KEY)
+        self.assertIsNot(username_index(), index)
+
+    def test_uncommitted_changes_are_not_indexed(self):
+        username_index()
+        with self.captureOnCommitCallbacks(execute=False):
+            User.objects.create_user('@johnny', first_name='Johnny', last_name='Doe', email='johnny@example.org')
+        self.assertNotIn('@johnny', autocomplete._index.suggest('@john'))
+
+
+class SuggestInviteesTestCase(TestCase):
+    """Unit tests for the suggestions of users to invite to a team."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json'
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.team = Team.objects.get(pk=1)
+        self.team.team_members.set(User.objects.filter(username='@janedoe'))
+
+    def test_members_the_asking_user_and_typed_names_are_left_out(self):
+        suggestions = suggest_invitees(self.team.id, '@petrapickles @', '@johndoe')
+        self.assertNotIn('@janedoe', suggestions)
+        self.assertNotIn('@johndoe', suggestions)
+        self.assertNotIn('@petrapickles', suggestions)
+        self.assertTrue(suggestions)
+
+    def test_suggestions_are_cached_by_team_and_query(self):
+        suggest_invitees(self.team.id, '@pet', '@johndoe')
+        with self.assertNumQueries(0):
+            self.assertEqual(suggest_invitees(self.team.id, '@pet', '@johndoe'), ['@peterpickles', '@petrapickles'])
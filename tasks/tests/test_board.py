@@ -0,0 +1,201 @@
+"""Unit tests for the board loader."""
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.http import Http404
+from django.test import TestCase
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from tasks.board import LANE_ORDER_GAP, add_lane, board_tasks, load_board, move_lane, move_tasks, rebalance_lanes, reorder_lanes
+from tasks.models import Task, Team, Lane
+
+
+class BoardLoaderTestCase(TestCase):
+    """Unit tests for load_board."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json',
+        'tasks/tests/fixtures/other_lanes.json',
+        'tasks/tests/fixtures/default_task.json',
+        'tasks/tests/fixtures/other_tasks.json'
+    ]
+
+    def setUp(self):
+        self.team = Team.objects.get(pk=1)
+        self.lane = Lane.objects.get(pk=1)
+        self.lane2 = Lane.objects.get(pk=2)
+        self.task = Task.objects.get(pk=1)
+        self.task2 = Task.objects.get(pk=2)
+
+    def test_lanes_are_in_order(self):
+        self.lane.lane_order = 3
+        self.lane.save()
+        lanes = load_board(self.team)
+        self.assertEqual(lanes, [self.lane2, self.lane])
+
+    def test_tasks_are_grouped_by_lane(self):
+        self.task2.lane = self.lane2
+        self.task2.save()
+        lanes = load_board(self.team)
+        self.assertEqual([task.id for task in lanes[0].board_tasks], [1, 3, 4, 5])
+        self.assertEqual([task.id for task in lanes[1].board_tasks], [2])
+
+    def test_tasks_waiting_on_unfinished_dependencies_are_blocked(self):
+        # Lane 2 is the team's last lane, so tasks in it are finished
+        self.task.dependencies.add(self.task2)
+        blocked = {task.id: task.blocked for task in load_board(self.team)[0].board_tasks}
+        self.assertTrue(blocked[1])
+        self.assertFalse(blocked[2])
+        self.task2.lane = self.lane2
+        self.task2.save()
+        blocked = {task.id: task.blocked for task in load_board(self.team)[0].board_tasks}
+        self.assertFalse(blocked[1])
+
+    def test_board_tasks_are_not_grouped(self):
+        self.assertNotIn('GROUP BY', str(board_tasks(self.team).query))
+
+    def test_no_team_gives_empty_board(self):
+        self.assertEqual(load_board(None), [])
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        for number in range(20):
+            task = Task.objects.create(
+                name=f'Extra {number}',
+                due_date=timezone.now() + timedelta(days=30),
+                lane=self.lane2,
+                assigned_team=self.team
+            )
+            task.dependencies.add(self.task)
+        with self.assertNumQueries(2):
+            lanes = load_board(self.team)
+            for lane in lanes:
+                for task in lane.board_tasks:
+                    task.blocked
+
+
+class LaneOrderingTestCase(TestCase):
+    """Unit tests for moving, rebalancing and reordering lanes."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+    ]
+
+    def setUp(self):
+        self.team = Team.objects.get(pk=1)
+        self.lanes = [add_lane(self.team) for _ in range(3)]
+
+    def _lane_ids(self):
+        return list(Lane.objects.filter(team=self.team).order_by('lane_order').values_list('id', flat=True))
+
+    def test_new_lanes_are_spaced_apart(self):
+        orders = [lane.lane_order for lane in self.lanes]
+        self.assertEqual(orders, [LANE_ORDER_GAP, 2 * LANE_ORDER_GAP, 3 * LANE_ORDER_GAP])
+
+    def test_move_with_room_updates_one_lane(self):
+        with self.assertNumQueries(6):
+            changed = move_lane(self.team, self.lanes[2].id, -1)
+        self.assertEqual(changed, [self.lanes[2]])
+        self.assertEqual(self._lane_ids(), [self.lanes[0].id, self.lanes[2].id, self.lanes[1].id])
+
+    def test_repeated_moves_rebalance_when_the_gap_runs_out(self):
+        first, middle, last = self.lanes
+        for _ in range(30):
+            move_lane(self.team, last.id, -1)
+            move_lane(self.team, last.id, 1)
+        self.assertEqual(self._lane_ids(), [first.id, middle.id, last.id])
+        for _ in range(30):
+            move_lane(self.team, middle.id, -1)
+            move_lane(self.team, middle.id, 1)
+        self.assertEqual(self._lane_ids(), [first.id, middle.id, last.id])
+
+    def test_moving_past_the_end_changes_nothing(self):
+        self.assertEqual(move_lane(self.team, self.lanes[0].id, -1), [])
+        self.assertEqual(move_lane(self.team, self.lanes[2].id, 1), [])
+
+    def test_rebalance_keeps_the_order(self):
+        Lane.objects.filter(pk=self.lanes[0].pk).update(lane_order=-1)
+        Lane.objects.filter(pk=self.lanes[1].pk).update(lane_order=0)
+        Lane.objects.filter(pk=self.lanes[2].pk).update(lane_order=1)
+        rebalance_lanes(self.team)
+        orders = list(Lane.objects.filter(team=self.team).order_by('lane_order').values_list('lane_order', flat=True))
+        self.assertEqual(orders, [LANE_ORDER_GAP, 2 * LANE_ORDER_GAP, 3 * LANE_ORDER_GAP])
+        self.assertEqual(self._lane_ids(), [lane.id for lane in self.lanes])
+
+    def test_reorder_lanes(self):
+        new_order = [self.lanes[2].id, self.lanes[0].id, self.lanes[1].id]
+        reorder_lanes(self.team, new_order)
+        self.assertEqual(self._lane_ids(), new_order)
+
+    def test_reorder_lanes_rejects_partial_orders(self):
+        with self.assertRaises(ValidationError):
+            reorder_lanes(self.team, [self.lanes[0].id, self.lanes[0].id, self.lanes[1].id])
+        self.assertEqual(self._lane_ids(), [lane.id for lane in self.lanes])
+
+    def test_rebalance_command(self):
+        Lane.objects.filter(pk=self.lanes[0].pk).update(lane_order=5)
+        output = StringIO()
+        call_command('rebalance_lanes', stdout=output)
+        self.assertIn('1 team(s)', output.getvalue())
+        self.lanes[0].refresh_from_db()
+        self.assertEqual(self.lanes[0].lane_order, LANE_ORDER_GAP)
+
+
+class BulkMoveTasksTestCase(TestCase):
+    """Unit tests for move_tasks."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json',
+        'tasks/tests/fixtures/other_lanes.json',
+        'tasks/tests/fixtures/default_task.json',
+        'tasks/tests/fixtures/other_tasks.json'
+    ]
+
+    def setUp(self):
+        self.team = Team.objects.get(pk=1)
+        self.lane = Lane.objects.get(pk=1)
+        self.lane2 = Lane.objects.get(pk=2)
+        self.other_team = Team.objects.create(team_name='Other', team_creator=self.team.team_creator)
+        self.other_lane = Lane.objects.create(lane_name='Elsewhere', lane_order=1, team=self.other_team)
+        self.other_task = Task.objects.create(
+            name='Not ours',
+            due_date=timezone.now() + timedelta(days=30),
+            lane=self.other_lane,
+            assigned_team=self.other_team
+        )
+
+    def test_tasks_are_moved_with_one_update(self):
+        with self.assertNumQueries(6):
+            moved = move_tasks(self.team, [1, 2, 3], self.lane2.id)
+        self.assertEqual([task.id for task in moved], [1, 2, 3])
+        self.assertEqual(Task.objects.filter(lane=self.lane2).count(), 3)
+        self.assertEqual(Task.objects.get(pk=4).lane, self.lane)
+
+    def test_tasks_of_another_team_are_rejected(self):
+        with self.assertRaises(ValidationError):
+            move_tasks(self.team, [1, self.other_task.id], self.lane2.id)
+        self.assertEqual(Task.objects.filter(lane=self.lane2).count(), 0)
+        self.assertEqual(Task.objects.get(pk=self.other_task.id).lane, self.other_lane)
+
+    def test_lane_of_another_team_is_not_found(self):
+        with self.assertRaises(Http404):
+            move_tasks(self.team, [1], self.other_lane.id)
+
+    def test_move_tasks_command(self):
+        output = StringIO()
+        call_command('move_tasks', str(self.lane2.id), '1', '2', stdout=output)
+        self.assertIn('Moved 2 task(s)', output.getvalue())
+        self.assertEqual(Task.objects.filter(lane=self.lane2).count(), 2)
+
+    def test_move_tasks_command_rejects_tasks_of_another_team(self):
+        with self.assertRaises(CommandError):
+            call_command('move_tasks', str(self.lane2.id), '1', str(self.other_task.id), stdout=StringIO())
+        self.assertEqual(Task.objects.get(pk=1).lane, self.lane)
@@ -0,0 +1,101 @@
+"""Unit tests for the deadline sweeper."""
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import datetime, timedelta
+from io import StringIO
+from tasks.deadlines import due_tasks, refresh_deadline_notifications, sweep_deadlines
+from tasks.models import Task, Team, Lane, User, TaskNotification
+from tasks.notifications import bulk_send_notifications
+
+
+class DeadlineSweeperTestCase(TestCase):
+    """Unit tests for sweep_deadlines."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.user2 = User.objects.get(username='@janedoe')
+        self.team = Team.objects.get(pk=1)
+        self.team.add_invited_member(self.user)
+        self.team.add_invited_member(self.user2)
+        self.lane = Lane.objects.get(pk=1)
+        self.soon_task = self._create_task('Soon task', days=3)
+        self.later_task = self._create_task('Later task', days=30)
+
+    def _create_task(self, name, days):
+        return Task.objects.create(
+            name=name,
+            due_date=timezone.now() + timedelta(days=days),
+            lane=self.lane,
+            assigned_team=self.team
+        )
+
+    def _deadline_notifications(self, task):
+        return TaskNotification.objects.filter(task=task, notification_type=TaskNotification.NotificationType.DEADLINE)
+
+    def test_sweep_notifies_members_of_tasks_due_soon(self):
+        sweep_deadlines()
+        self.assertEqual(self._deadline_notifications(self.soon_task).count(), 2)
+        self.assertEqual(self._deadline_notifications(self.later_task).count(), 0)
+
+    def test_swept_tasks_are_no_longer_due(self):
+        self.assertEqual(due_tasks().count(), 2)
+        processed = sweep_deadlines(batch_size=1)
+        self.assertEqual(processed, 2)
+        self.assertEqual(due_tasks().count(), 0)
+        self.assertEqual(sweep_deadlines(), 0)
+
+    def test_sweep_can_be_limited_to_a_team(self):
+        other_team = Team.objects.create(team_name='Other', team_creator=self.user)
+        self.assertEqual(sweep_deadlines(team=other_team), 0)
+        self.assertEqual(due_tasks(team=self.team).count(), 2)
+
+    def test_sweep_command(self):
+        output = StringIO()
+        call_command('sweep_deadlines', stdout=output)
+        self.assertIn('2 task(s)', output.getvalue())
+        self.assertEqual(self._deadline_notifications(self.soon_task).count(), 2)
+
+    def test_refresh_replaces_stale_deadline_notifications(self):
+        refresh_deadline_notifications([self.soon_task])
+        stale_ids = set(self._deadline_notifications(self.soon_task).values_list('id', flat=True))
+        self.soon_task.deadline_notif_sent = self.soon_task.deadline_notif_sent - timedelta(days=1)
+        refresh_deadline_notifications([self.soon_task])
+        fresh_ids = set(self._deadline_notifications(self.soon_task).values_list('id', flat=True))
+        self.assertEqual(len(fresh_ids), 2)
+        self.assertFalse(stale_ids & fresh_ids)
+        self.assertEqual(self.user.get_notifications().count(), 1)
+
+    def test_refresh_retracts_notifications_when_postponed(self):
+        refresh_deadline_notifications([self.soon_task])
+        self.soon_task.due_date = timezone.now() + timedelta(days=20)
+        self.soon_task.deadline_notif_sent = datetime.today().date() - timedelta(days=1)
+        changed = refresh_deadline_notifications([self.soon_task])
+        self.assertEqual(changed, [self.soon_task])
+        self.assertEqual(self._deadline_notifications(self.soon_task).count(), 0)
+        reminder_date = (self.soon_task.due_date - timedelta(days=5)).date()
+        self.soon_task.refresh_from_db()
+        self.assertEqual(self.soon_task.deadline_notif_sent, reminder_date)
+
+    def test_refresh_cost_does_not_grow_with_existing_notifications(self):
+        def count_queries():
+            task = self._create_task('Another soon task', days=2)
+            with CaptureQueriesContext(connection) as queries:
+                refresh_deadline_notifications([task])
+            return len(queries)
+
+        baseline = count_queries()
+        bulk_send_notifications(
+            (user.id, TaskNotification(task=self.later_task))
+            for user in [self.user, self.user2] * 50
+        )
+        self.assertEqual(count_queries(), baseline)
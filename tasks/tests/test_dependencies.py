@@ -0,0 +1,179 @@
+"""Unit tests for the task dependency graph and closure table."""
+from datetime import datetime, timedelta, timezone
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from tasks.dependencies import DependencyGraph, dependency_graph, transitive_blockers, transitive_dependents, verify_closure
+from tasks.forms import TaskForm
+from tasks.models import DependencyClosure, Task, Team
+from io import StringIO
+
+
+def due(day):
+    return datetime(2030, 1, day, tzinfo=timezone.utc)
+
+
+class DependencyGraphTestCase(SimpleTestCase):
+    """Unit tests for working with a dependency graph."""
+
+    def setUp(self):
+        # 4 depends on 2 and 3, which both depend on 1; 5 stands alone
+        self.graph = DependencyGraph([
+            (1, 'Design', due(1), None),
+            (2, 'Build', due(5), 1),
+            (3, 'Write docs', due(9), 1),
+            (4, 'Release', due(10), 2),
+            (4, 'Release', due(10), 3),
+            (5, 'Party', due(2), None),
+        ])
+
+    def test_blockers_and_unblocks_are_transitive(self):
+        self.assertEqual(self.graph.blockers(4), {1, 2, 3})
+        self.assertEqual(self.graph.blockers(1), set())
+        self.assertEqual(self.graph.unblocks(1), {2, 3, 4})
+
+    def test_topological_order_puts_dependencies_first(self):
+        self.assertEqual(self.graph.topological_order(), [1, 2, 3, 4, 5])
+
+    def test_topological_order_rejects_cycles(self):
+        graph = DependencyGraph([(1, 'A', due(1), 2), (2, 'B', due(2), 1)])
+        with self.assertRaises(ValidationError):
+            graph.topological_order()
+
+    def test_critical_path_follows_the_latest_due_chain(self):
+        self.assertEqual(self.graph.critical_path(), [1, 3, 4])
+        self.assertEqual(self.graph.critical_path(2), [1, 2])
+        self.assertEqual(self.graph.names_of(self.graph.critical_path(5)), ['Party'])
+
+    def test_find_cycle(self):
+        self.assertEqual(self.graph.find_cycle(1, [4]), [1, 4, 2, 1])
+        self.assertEqual(self.graph.find_cycle(3, [3]), [3, 3])
+        self.assertIsNone(self.graph.find_cycle(4, [5]))
+
+
+class TaskDependenciesTestCase(TestCase):
+    """Tests for setting dependencies and caching the graph."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json',
+        'tasks/tests/fixtures/default_task.json',
+        'tasks/tests/fixtures/other_tasks.json'
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.team = Team.objects.get(pk=1)
+        self.task1, self.task2, self.task3 = Task.objects.filter(pk__in=[1, 2, 3]).order_by('pk')
+        self.task2.set_dependencies(Task.objects.filter(pk=1))
+        self.task3.set_dependencies(Task.objects.filter(pk=2))
+
+    def test_set_dependencies_replaces_the_dependencies(self):
+        self.task3.set_dependencies(Task.objects.filter(pk__in=[1, 4]))
+        self.assertEqual(set(self.task3.dependencies.values_list('pk', flat=True)), {1, 4})
+
+    def test_set_dependencies_rejects_cycles(self):
+        with self.assertRaises(ValidationError):
+            self.task1.set_dependencies(Task.objects.filter(pk=3))
+        with self.assertRaises(ValidationError):
+            self.task1.set_dependencies(Task.objects.filter(pk=1))
+        self.assertFalse(self.task1.dependencies.exists())
+
+    def test_set_dependencies_rejects_cycles_across_teams(self):
+        other_team = Team.objects.create(team_name='Other team', team_creator=self.team.team_creator)
+        blocker = Task.objects.create(name='Blocker', assigned_team=other_team, due_date=self.task1.due_date)
+        dependent = Task.objects.create(name='Dependent', assigned_team=other_team, due_date=self.task1.due_date)
+        self.task1.set_dependencies([blocker])
+        dependent.set_dependencies([self.task1])
+        with self.assertRaisesMessage(ValidationError, 'Blocker -> Dependent -> Task1 -> Blocker'):
+            blocker.set_dependencies([dependent])
+        self.assertFalse(blocker.dependencies.exists())
+
+    def test_task_form_reports_cycles(self):
+        form = TaskForm(instance=self.task1, data={
+            'name': self.task1.name,
+            'description': self.task1.description,
+            'priority': 'medium',
+            'dependencies': [3],
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn('dependencies', form.errors)
+
+    def test_graph_is_loaded_once_per_revision(self):
+        graph = dependency_graph(Team.objects.get(pk=1))
+        self.assertEqual(graph.blockers(3), {1, 2})
+        with self.assertNumQueries(1):
+            dependency_graph(Team.objects.get(pk=1))
+        self.task1.set_dependencies(Task.objects.filter(pk=4))
+        self.assertEqual(dependency_graph(Team.objects.get(pk=1)).blockers(3), {1, 2, 4})
+
+    def test_task_page_shows_transitive_blockers(self):
+        self.client.login(username='@johndoe', password='Password123')
+        response = self.client.get(reverse('task', kwargs={'pk': self.task3.pk}))
+        self.assertEqual(response.context['blockers'], [self.task1.name, self.task2.name])
+        self.assertEqual(response.context['critical_path'], [self.task1.name, self.task2.name, self.task3.name])
+
+
+class DependencyClosureTestCase(TestCase):
+    """Tests for keeping the transitive dependency table up to date."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json',
+        'tasks/tests/fixtures/default_task.json',
+        'tasks/tests/fixtures/other_tasks.json'
+    ]
+
+    def setUp(self):
+        self.task1, self.task2, self.task3, self.task4 = Task.objects.filter(pk__in=[1, 2, 3, 4]).order_by('pk')
+        # 3 depends on 2, which depends on 1
+        self.task2.set_dependencies([self.task1])
+        self.task3.set_dependencies([self.task2])
+
+    def assertClosureIsCorrect(self):
+        self.assertEqual(verify_closure(), ([], []))
+
+    def test_transitive_lookups(self):
+        self.assertEqual(set(transitive_blockers(self.task3)), {self.task1, self.task2})
+        self.assertEqual(set(transitive_dependents(self.task1)), {self.task2, self.task3})
+        with self.assertNumQueries(1):
+            list(transitive_blockers(self.task3))
+
+    def test_adding_a_dependency_reaches_every_dependent(self):
+        self.task1.set_dependencies([self.task4])
+        self.assertEqual(set(transitive_blockers(self.task3)), {self.task1, self.task2, self.task4})
+        self.assertClosureIsCorrect()
+
+    def test_removing_a_dependency_reaches_every_dependent(self):
+        self.task2.set_dependencies([])
+        self.assertEqual(set(transitive_blockers(self.task3)), {self.task2})
+        self.assertClosureIsCorrect()
+
+    def test_changes_from_the_other_side_are_recorded(self):
+        self.task4.task_set.add(self.task1)
+        self.assertIn(self.task4, transitive_blockers(self.task3))
+        self.task2.task_set.clear()
+        self.assertEqual(set(transitive_blockers(self.task3)), set())
+        self.assertClosureIsCorrect()
+
+    def test_deleting_a_task_in_a_chain(self):
+        self.task2.delete()
+        self.assertEqual(set(transitive_blockers(self.task3)), set())
+        self.assertClosureIsCorrect()
+
+    def test_rebuild_dependency_closure_command(self):
+        DependencyClosure.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command('rebuild_dependency_closure', '--verify', stdout=StringIO())
+        out = StringIO()
+        call_command('rebuild_dependency_closure', stdout=out)
+        self.assertIn('Recorded 3 transitive dependencies.', out.getvalue())
+        call_command('rebuild_dependency_closure', '--verify', stdout=out)
+        self.assertIn('The dependency closure is up to date.', out.getvalue())
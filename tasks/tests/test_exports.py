@@ -0,0 +1,61 @@
+"""Unit tests for streaming task exports."""
+import csv
+import json
+from django.core.management import call_command
+from django.test import TestCase
+from io import StringIO
+from tasks.exports import EXPORT_COLUMNS, export_rows, stream_csv, stream_jsonl
+from tasks.models import Task, User
+
+
+class TaskExportTestCase(TestCase):
+    """Unit tests for the task export streams."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json',
+        'tasks/tests/fixtures/other_tasks.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.task = Task.objects.get(pk=3)
+        self.task.assigned_users.add(self.user)
+
+    def test_rows_hold_every_column(self):
+        row = next(export_rows(Task.objects.filter(pk=3)))
+        self.assertEqual(list(row), EXPORT_COLUMNS)
+        self.assertEqual(row['name'], 'Task3')
+        self.assertEqual(row['priority'], 'Low')
+        self.assertEqual(row['assignees'], '@johndoe')
+
+    def test_related_objects_are_loaded_per_chunk(self):
+        # One streamed query for the tasks, plus one for the assignees of each chunk of two
+        with self.assertNumQueries(3):
+            rows = list(export_rows(Task.objects.order_by('id'), chunk_size=2))
+        self.assertEqual(len(rows), 4)
+
+    def test_csv_stream(self):
+        lines = list(stream_csv(Task.objects.order_by('id')))
+        rows = list(csv.reader(lines))
+        self.assertEqual(rows[0], EXPORT_COLUMNS)
+        self.assertEqual([row[1] for row in rows[1:]], ['Task2', 'Task3', 'Task4', 'Task5'])
+
+    def test_jsonl_stream(self):
+        lines = list(stream_jsonl(Task.objects.order_by('id')))
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(json.loads(lines[1])['name'], 'Task3')
+
+    def test_export_command_uses_the_search_filters(self):
+        output = StringIO()
+        call_command('export_tasks', '--format', 'jsonl', '--priority', '3', stdout=output)
+        rows = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['Task5'])
+
+    def test_export_command_sorts_like_the_search_page(self):
+        output = StringIO()
+        call_command('export_tasks', '--sort-column', 'due_date', '--sort-direction', 'desc', stdout=output)
+        rows = list(csv.reader(output.getvalue().splitlines()))
+        self.assertEqual([row[1] for row in rows[1:]], ['Task2', 'Task5', 'Task4', 'Task3'])
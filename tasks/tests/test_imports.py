@@ -0,0 +1,134 @@
+"""Unit tests for bulk task imports."""
+import json
+import os
+import tempfile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from io import StringIO
+from tasks.dependencies import transitive_blockers, verify_closure
+from tasks.imports import TaskImporter, read_csv, read_jsonl
+from tasks.models import Lane, Task, Team, User
+from tasks.search import search_tasks
+
+HEADER = 'name,description,priority,due_date,lane,team,assignees,dependencies\n'
+
+
+class TaskImportTestCase(TestCase):
+    """Unit tests for importing tasks in chunks."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json',
+        'tasks/tests/fixtures/default_task.json'
+    ]
+
+    def setUp(self):
+        self.team = Team.objects.get(pk=1)
+        self.lane = Lane.objects.get(pk=1)
+        self.done = Lane.objects.create(lane_name='Done', lane_order=2, team=self.team)
+        self.user = User.objects.get(username='@johndoe')
+        self.team.team_members.add(self.user)
+
+    def _import_csv(self, lines, **kwargs):
+        importer = TaskImporter(**kwargs)
+        created = list(importer.import_rows(read_csv(StringIO(HEADER + ''.join(lines)))))
+        return importer, created
+
+    def test_rows_are_imported_with_their_names_resolved(self):
+        importer, created = self._import_csv([
+            'Write report,Sales figures,High,2030-01-01T09:00:00+00:00,Done,Team A,@johndoe,Task1\n',
+            'Send report,,low,2030-01-02 09:00,,Team A,,"Write report, Task1"\n',
+        ])
+        self.assertEqual(created, [2])
+        self.assertEqual(importer.errors, [])
+        report = Task.objects.get(name='Write report')
+        self.assertEqual(report.priority, Task.Priority.HIGH)
+        self.assertEqual(report.lane, self.done)
+        self.assertEqual(list(report.assigned_users.all()), [self.user])
+        sending = Task.objects.get(name='Send report')
+        self.assertEqual(sending.priority, Task.Priority.LOW)
+        self.assertEqual(sending.lane, self.lane)
+        self.assertEqual(set(sending.dependencies.values_list('name', flat=True)), {'Write report', 'Task1'})
+
+    def test_invalid_rows_are_skipped_and_reported(self):
+        importer, created = self._import_csv([
+            'Fine task,,,2030-01-01 09:00,,Team A,,\n',
+            'No!,,,2030-01-01 09:00,,Team A,,\n',
+            'Lost task,,,2030-01-01 09:00,,Team B,,\n',
+            'Lonely task,,,2030-01-01 09:00,,Team A,@janedoe,\n',
+            'Late task,,,yesterday,,Team A,,Missing task\n',
+            'Odd task,,urgent,2030-01-01 09:00,Nowhere,Team A,,\n',
+        ])
+        self.assertEqual(created, [1])
+        self.assertEqual([line for line, _ in importer.errors], [3, 4, 5, 6, 7])
+        messages = dict(importer.errors)
+        self.assertIn('name: Enter a valid word', messages[3])
+        self.assertIn('There is no team called "Team B".', messages[4])
+        self.assertIn('not members of the team: @janedoe', messages[5])
+        self.assertIn('due_date: Enter a valid date and time.', messages[6])
+        self.assertIn('The team has no task called: Missing task.', messages[6])
+        self.assertIn('priority: Enter one of Low, Medium, High.', messages[7])
+        self.assertIn('The team has no lane called "Nowhere".', messages[7])
+
+    def test_rows_without_a_team_use_the_default_team(self):
+        importer, created = self._import_csv(['Fine task,,,2030-01-01 09:00,,,,\n'], team=self.team)
+        self.assertEqual(created, [1])
+        self.assertEqual(Task.objects.get(name='Fine task').assigned_team, self.team)
+
+    def test_dependencies_reach_back_across_chunks(self):
+        importer, created = self._import_csv([
+            'First task,,,2030-01-01 09:00,,Team A,,\n',
+            'Second task,,,2030-01-02 09:00,,Team A,,First task\n',
+            'Third task,,,2030-01-03 09:00,,Team A,,Second task\n',
+        ], chunk_size=2)
+        self.assertEqual(created, [2, 1])
+        third = Task.objects.get(name='Third task')
+        self.assertEqual(set(transitive_blockers(third).values_list('name', flat=True)), {'First task', 'Second task'})
+        self.assertEqual(verify_closure(), ([], []))
+
+    def test_ambiguous_dependencies_are_reported(self):
+        importer, _ = self._import_csv([
+            'Task1,,,2030-01-01 09:00,,Team A,,\n',
+            'Later task,,,2030-01-02 09:00,,Team A,,Task1\n',
+        ])
+        self.assertIn('More than one task in the team is called: Task1.', importer.errors[0][1])
+
+    def test_imported_tasks_are_searchable_and_move_the_revision_on(self):
+        revision = self.team.revision
+        importer = TaskImporter()
+        rows = read_jsonl(StringIO(
+            json.dumps({'name': 'Quarterly figures', 'due_date': '2030-01-01T09:00:00', 'team': 'Team A'}) + '\n\nnot json\n'
+        ))
+        self.assertEqual(list(importer.import_rows(rows)), [1])
+        self.assertEqual(importer.errors, [(3, 'Each row must be an object of columns.')])
+        self.assertEqual([task.name for task in search_tasks(Task.objects.all(), 'quarterly')], ['Quarterly figures'])
+        self.team.refresh_from_db()
+        self.assertGreater(self.team.revision, revision)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def queries(count):
+            lines = [f'Task {count} {number},,,2030-01-01 09:00,,Team A,@johndoe,Task1\n' for number in range(count)]
+            with CaptureQueriesContext(connection) as context:
+                self._import_csv(lines, chunk_size=100)
+            return len(context.captured_queries)
+
+        self.assertEqual(queries(5), queries(50))
+
+    def test_import_tasks_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tasks.csv')
+            with open(path, 'w') as output:
+                output.write(HEADER + 'Fine task,,,2030-01-01 09:00,,Team A,,\nNo!,,,2030-01-01 09:00,,Team A,,\n')
+            out = StringIO()
+            err = StringIO()
+            call_command('import_tasks', path, stdout=out, stderr=err)
+            with self.assertRaises(CommandError):
+                call_command('import_tasks', os.path.join(directory, 'tasks.txt'), stdout=StringIO())
+        self.assertIn('Imported 1 tasks and skipped 1 rows', out.getvalue())
+        self.assertIn('Line 3: name:', err.getvalue())
+        self.assertTrue(Task.objects.filter(name='Fine task').exists())
@@ -0,0 +1,64 @@
+"""Unit tests for purging expired invites."""
+from datetime import timedelta
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from io import StringIO
+from tasks.invites import purge_expired_invites
+from tasks.models import Invite, InviteNotification, Notification, Team, User
+
+
+class PurgeExpiredInvitesTestCase(TestCase):
+    """Unit tests for deleting expired invites with their notifications."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json'
+    ]
+
+    def setUp(self):
+        self.team = Team.objects.get(pk=1)
+        self.user = User.objects.get(username='@janedoe')
+        self.expired = []
+        for _ in range(3):
+            invite = Invite.objects.create(inviting_team=self.team, expires_at=timezone.now() - timedelta(days=1))
+            invite.set_invited_users('@janedoe @peterpickles')
+            self.expired.append(invite)
+        self.current = Invite.objects.create(inviting_team=self.team)
+        self.current.set_invited_users('@janedoe')
+
+    def test_new_invites_expire_after_their_lifetime(self):
+        self.assertAlmostEqual(self.current.expires_at, timezone.now() + Invite.LIFETIME, delta=timedelta(minutes=1))
+        self.assertFalse(self.current.has_expired())
+        self.assertTrue(self.expired[0].has_expired())
+
+    def test_expired_invites_and_their_notifications_are_deleted(self):
+        self.assertEqual(purge_expired_invites(batch_size=2), 3)
+        self.assertEqual(list(Invite.objects.all()), [self.current])
+        self.assertEqual(list(InviteNotification.objects.values_list('invite', flat=True)), [self.current.id])
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(list(self.user.notifications.values_list('id', flat=True)), [InviteNotification.objects.get().id])
+        self.assertEqual(Invite.invited_users.through.objects.count(), 1)
+
+    def test_each_batch_takes_a_fixed_number_of_queries(self):
+        # Two batches of thirteen queries, and one finding nothing left
+        with self.assertNumQueries(27):
+            purge_expired_invites(batch_size=2)
+
+    def test_deleting_an_invite_outside_a_purge_still_moves_the_revision_on(self):
+        purge_expired_invites()
+        revision = Team.objects.get(pk=self.team.pk).revision
+        self.current.delete()
+        self.assertGreater(Team.objects.get(pk=self.team.pk).revision, revision)
+
+    def test_purge_moves_the_team_on_to_a_new_revision(self):
+        revision = Team.objects.get(pk=self.team.pk).revision
+        purge_expired_invites()
+        self.assertGreater(Team.objects.get(pk=self.team.pk).revision, revision)
+
+    def test_purge_invites_command(self):
+        out = StringIO()
+        call_command('purge_invites', stdout=out)
+        self.assertIn('Purged 3 expired invite(s).', out.getvalue())
+        self.assertEqual(Invite.objects.count(), 1)
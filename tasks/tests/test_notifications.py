@@ -0,0 +1,167 @@
+"""Unit tests for the notification helpers."""
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from datetime import timedelta
+from tasks.models import Task, Team, Lane, User, Invite, Notification, TaskNotification, InviteNotification
+from tasks.notifications import bulk_send_notifications, load_notification_feed, notification_counts
+
+
+class BulkSendNotificationsTestCase(TestCase):
+    """Unit tests for bulk_send_notifications."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.user2 = User.objects.get(username='@janedoe')
+        self.team = Team.objects.get(pk=1)
+        self.task = Task.objects.create(
+            name='Test task',
+            due_date=timezone.now() + timedelta(days=10),
+            lane=Lane.objects.get(pk=1),
+            assigned_team=self.team
+        )
+        self.invite = Invite.objects.create(inviting_team=self.team)
+
+    def test_notifications_are_saved_and_delivered(self):
+        sent = bulk_send_notifications([
+            (self.user.id, TaskNotification(task=self.task)),
+            (self.user2.id, InviteNotification(invite=self.invite)),
+        ])
+        self.assertEqual(len(sent), 2)
+        self.assertEqual(self.user.get_notifications()[0].as_task_notif().task, self.task)
+        self.assertEqual(self.user2.get_notifications()[0].as_invite_notif().invite, self.invite)
+        self.assertEqual(sent[0], TaskNotification.objects.get(pk=sent[0].pk))
+
+    def test_query_count_does_not_grow_with_notifications(self):
+        # One insert per table, wrapped in a savepoint
+        with self.assertNumQueries(5):
+            bulk_send_notifications((self.user.id, TaskNotification(task=self.task)) for _ in range(50))
+        self.assertEqual(self.user.get_notifications().count(), 50)
+        self.assertEqual(Notification.objects.count(), 50)
+
+    def test_nothing_to_send(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(bulk_send_notifications([]), [])
+
+
+class NotificationFeedTestCase(TestCase):
+    """Unit tests for load_notification_feed."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.team = Team.objects.get(pk=1)
+        self.other_team = Team.objects.create(team_name='Other team', team_creator=self.user)
+        self.task = Task.objects.create(
+            name='Test task',
+            due_date=timezone.now() + timedelta(days=10),
+            lane=Lane.objects.get(pk=1),
+            assigned_team=self.team
+        )
+        self.other_task = Task.objects.create(
+            name='Other task',
+            due_date=timezone.now() + timedelta(days=10),
+            lane=Lane.objects.create(lane_name='Other lane', team=self.other_team),
+            assigned_team=self.other_team
+        )
+        self.invite = Invite.objects.create(inviting_team=self.other_team, invite_message='Join us')
+
+    def test_notifications_have_their_concrete_type(self):
+        bulk_send_notifications([
+            (self.user.id, TaskNotification(task=self.task)),
+            (self.user.id, InviteNotification(invite=self.invite)),
+        ])
+        feed = load_notification_feed(self.user)
+        self.assertIsInstance(feed[0], InviteNotification)
+        self.assertEqual(feed[0].kind, 'invite')
+        self.assertIsInstance(feed[1], TaskNotification)
+        self.assertEqual(feed[1].kind, 'task')
+
+    def test_task_notifications_are_limited_to_the_team(self):
+        bulk_send_notifications([
+            (self.user.id, TaskNotification(task=self.task)),
+            (self.user.id, TaskNotification(task=self.other_task)),
+            (self.user.id, InviteNotification(invite=self.invite)),
+        ])
+        feed = load_notification_feed(self.user, team_id=self.team.id)
+        self.assertEqual([notification.kind for notification in feed], ['invite', 'task'])
+        self.assertEqual(feed[1].task, self.task)
+
+    def test_query_count_does_not_grow_with_notifications(self):
+        bulk_send_notifications(
+            (self.user.id, TaskNotification(task=self.task) if number % 2 else InviteNotification(invite=self.invite))
+            for number in range(200)
+        )
+        with self.assertNumQueries(3):
+            feed = load_notification_feed(self.user, team_id=self.team.id)
+            for notification in feed:
+                notification.display()
+                if notification.kind == 'invite':
+                    notification.invite.inviting_team.team_creator.username
+                else:
+                    notification.task.assigned_team
+        self.assertEqual(len(feed), 200)
+
+
+class NotificationCountsTestCase(TestCase):
+    """Unit tests for notification_counts."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json'
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.get(username='@johndoe')
+        self.invite = Invite.objects.create(inviting_team=Team.objects.get(pk=1))
+
+    def test_counts_are_cached(self):
+        self.assertEqual(notification_counts(self.user), {'unread': 0, 'total': 0})
+        with self.assertNumQueries(0):
+            notification_counts(self.user)
+
+    def test_counts_refresh_after_add_notification(self):
+        notification_counts(self.user)
+        self.user.add_notification(InviteNotification.objects.create(invite=self.invite))
+        self.assertEqual(notification_counts(self.user), {'unread': 1, 'total': 1})
+
+    def test_counts_refresh_after_bulk_send(self):
+        notification_counts(self.user)
+        bulk_send_notifications([(self.user.id, InviteNotification(invite=self.invite))])
+        self.assertEqual(notification_counts(self.user), {'unread': 1, 'total': 1})
+
+    def test_counts_refresh_after_deleting_a_task_with_notifications(self):
+        team = Team.objects.get(pk=1)
+        task = Task.objects.create(
+            name='Doomed task', due_date=timezone.now() + timedelta(days=30),
+            lane=Lane.objects.create(lane_name='Backlog', team=team), assigned_team=team
+        )
+        bulk_send_notifications([(self.user.id, TaskNotification(task=task, notification_type='AS'))])
+        self.assertEqual(notification_counts(self.user), {'unread': 1, 'total': 1})
+        task.delete()
+        self.assertEqual(notification_counts(self.user), {'unread': 0, 'total': 0})
+
+    def test_counts_refresh_after_deleting_an_invite_with_notifications(self):
+        bulk_send_notifications([(self.user.id, InviteNotification(invite=self.invite))])
+        self.assertEqual(notification_counts(self.user), {'unread': 1, 'total': 1})
+        self.invite.delete()
+        self.assertEqual(notification_counts(self.user), {'unread': 0, 'total': 0})
+
+    def test_read_notifications_are_not_unread(self):
+        bulk_send_notifications([(self.user.id, InviteNotification(invite=self.invite, is_read=True))])
+        self.assertEqual(notification_counts(self.user), {'unread': 0, 'total': 1})
@@ -0,0 +1,114 @@
+"""Unit tests for team revisions and the board fragment cache."""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from tasks.models import Task, Team, Lane, User, Invite
+from tasks.revisions import CSRF_PLACEHOLDER
+
+
+class TeamRevisionTestCase(TestCase):
+    """Unit tests for the signals that bump team revisions."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json',
+        'tasks/tests/fixtures/default_task.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.user2 = User.objects.get(username='@janedoe')
+        self.team = Team.objects.get(pk=1)
+        self.lane = Lane.objects.get(pk=1)
+        self.task = Task.objects.get(pk=1)
+
+    def assertRevisionBumped(self, change):
+        before = Team.objects.get(pk=self.team.pk).revision
+        change()
+        self.assertGreater(Team.objects.get(pk=self.team.pk).revision, before)
+
+    def test_task_changes_bump_revision(self):
+        self.task.name = 'Renamed'
+        self.assertRevisionBumped(self.task.save)
+        self.assertRevisionBumped(self.task.delete)
+
+    def test_lane_changes_bump_revision(self):
+        self.lane.lane_name = 'Renamed'
+        self.assertRevisionBumped(self.lane.save)
+
+    def test_membership_changes_bump_revision(self):
+        self.assertRevisionBumped(lambda: self.team.team_members.add(self.user2))
+        self.assertRevisionBumped(lambda: self.user2.team_set.remove(self.team))
+
+    def test_dependency_changes_bump_revision(self):
+        other = Task.objects.create(
+            name='Other task',
+            due_date=timezone.now() + timedelta(days=30),
+            lane=self.lane,
+            assigned_team=self.team
+        )
+        self.assertRevisionBumped(lambda: self.task.dependencies.add(other))
+
+    def test_invite_changes_bump_revision(self):
+        self.assertRevisionBumped(lambda: Invite.objects.create(inviting_team=self.team))
+
+    def test_saving_a_stale_team_keeps_the_revision(self):
+        stale = Team.objects.get(pk=self.team.pk)
+        self.task.save()
+        revision = Team.objects.get(pk=self.team.pk).revision
+        stale.team_name = 'Renamed'
+        stale.save()
+        self.assertGreater(Team.objects.get(pk=self.team.pk).revision, revision)
+
+
+class BoardFragmentCacheTestCase(TestCase):
+    """Tests for the cached board fragments on the dashboard."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json',
+        'tasks/tests/fixtures/other_lanes.json',
+        'tasks/tests/fixtures/default_task.json',
+        'tasks/tests/fixtures/other_tasks.json'
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('dashboard')
+        self.team = Team.objects.get(pk=1)
+        self.task = Task.objects.get(pk=1)
+        self.client.login(username='@johndoe', password='Password123')
+        session = self.client.session
+        session['current_team_id'] = self.team.id
+        session.save()
+
+    def _count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        return len(queries)
+
+    def test_repeat_views_reuse_the_cached_board(self):
+        first = self._count_queries()
+        second = self._count_queries()
+        self.assertLess(second, first)
+
+    def test_changes_show_on_the_next_view(self):
+        self.client.get(self.url)
+        self.task.name = 'Renamed task'
+        self.task.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Renamed task')
+
+    def test_cached_board_gets_the_requesting_users_csrf_token(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertNotContains(response, CSRF_PLACEHOLDER)
+        self.assertContains(response, 'name="csrfmiddlewaretoken"')
@@ -0,0 +1,152 @@
+"""Unit tests for full-text task search."""
+from django.core.management import call_command
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from tasks.models import Task, Team, Lane, User
+from tasks.search import facet_counts, filter_by_facets, match_expression, rebuild_index, search_tasks
+
+
+class TaskSearchIndexTestCase(TestCase):
+    """Unit tests for the task full-text index."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json'
+    ]
+
+    def setUp(self):
+        self.team = Team.objects.get(pk=1)
+        self.lane = Lane.objects.get(pk=1)
+        self.report = self._create_task('Quarterly report', 'Collect the sales figures')
+        self.deploy = self._create_task('Deploy website', 'Ship the report page to production')
+
+    def _create_task(self, name, description):
+        return Task.objects.create(
+            name=name,
+            description=description,
+            due_date=timezone.now() + timedelta(days=30),
+            lane=self.lane,
+            assigned_team=self.team
+        )
+
+    def _search(self, query):
+        return list(search_tasks(Task.objects.all(), query))
+
+    def test_match_expression_quotes_each_word(self):
+        self.assertEqual(match_expression('sales "figures" OR'), '"sales"* "figures"* "OR"*')
+        self.assertEqual(match_expression('***'), '')
+
+    def test_search_covers_descriptions(self):
+        self.assertEqual(self._search('figures'), [self.report])
+
+    def test_search_matches_word_prefixes(self):
+        self.assertEqual(self._search('quart'), [self.report])
+
+    def test_name_matches_rank_first(self):
+        self.assertEqual(self._search('report'), [self.report, self.deploy])
+
+    def _index_writes(self, save):
+        with CaptureQueriesContext(connection) as context:
+            save()
+        return [query['sql'] for query in context.captured_queries if query['sql'].startswith(('INSERT INTO tasks_task_fts', 'DELETE FROM tasks_task_fts'))]
+
+    def test_saves_that_leave_the_text_alone_are_not_reindexed(self):
+        self.report.due_date += timedelta(days=1)
+        self.assertEqual(self._index_writes(self.report.save), [])
+        self.assertEqual(self._index_writes(lambda: self.report.save(update_fields=['due_date'])), [])
+        self.report.description = 'Collect the budget figures'
+        self.assertEqual(len(self._index_writes(self.report.save)), 2)
+        self.assertEqual(self._search('budget'), [self.report])
+
+    def test_index_is_matched_once_per_search(self):
+        # Matching again for every candidate row makes ranking quadratic
+        sql = str(search_tasks(Task.objects.all(), 'report').query)
+        self.assertEqual(sql.count('MATCH'), 1)
+
+    def test_index_follows_saves_and_deletes(self):
+        self.deploy.name = 'Launch website'
+        self.deploy.save()
+        self.assertEqual(self._search('deploy'), [])
+        self.assertEqual(self._search('launch'), [self.deploy])
+        self.report.delete()
+        self.assertEqual(self._search('report'), [self.deploy])
+
+    def test_punctuation_only_query_falls_back_to_like(self):
+        self.assertEqual(self._search('!!'), [])
+
+    def test_rebuild_index(self):
+        Task.objects.filter(pk=self.deploy.pk).update(name='Launch website')
+        self.assertEqual(self._search('launch'), [])
+        self.assertEqual(rebuild_index(), 2)
+        self.assertEqual(self._search('launch'), [self.deploy])
+
+    def test_rebuild_command(self):
+        output = StringIO()
+        call_command('rebuild_search_index', stdout=output)
+        self.assertIn('Indexed 2 task(s)', output.getvalue())
+
+    def test_benchmark_command_leaves_no_data(self):
+        output = StringIO()
+        call_command('benchmark_search', '--tasks', '50', '--repeat', '1', stdout=output)
+        self.assertIn('50', output.getvalue())
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertEqual(self._search('notes'), [])
+
+
+class FacetCountsTestCase(TestCase):
+    """Unit tests for facet counts and facet filters."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json',
+        'tasks/tests/fixtures/other_lanes.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.user2 = User.objects.get(username='@janedoe')
+        self.team = Team.objects.get(pk=1)
+        self.lane = Lane.objects.get(pk=1)
+        self.lane2 = Lane.objects.get(pk=2)
+        self.urgent = self._create_task('Urgent fix', Task.Priority.HIGH, self.lane, days=-1)
+        self.urgent.assigned_users.add(self.user, self.user2)
+        self.later = self._create_task('Later fix', Task.Priority.LOW, self.lane2, days=10)
+        self.later.assigned_users.add(self.user)
+        self._create_task('Later chore', Task.Priority.LOW, self.lane2, days=20)
+
+    def _create_task(self, name, priority, lane, days):
+        return Task.objects.create(
+            name=name,
+            priority=priority,
+            due_date=timezone.now() + timedelta(days=days),
+            lane=lane,
+            assigned_team=self.team
+        )
+
+    def test_all_facets_come_from_one_query(self):
+        with self.assertNumQueries(1):
+            counts = facet_counts(Task.objects.all())
+        self.assertEqual(counts['priority'], [(Task.Priority.LOW, 'Low', 2), (Task.Priority.HIGH, 'High', 1)])
+        self.assertEqual(counts['lane'], [(self.lane2.id, 'TestLane2', 2), (self.lane.id, 'TestLane', 1)])
+        self.assertEqual(counts['team'], [(self.team.id, self.team.team_name, 3)])
+        self.assertEqual(counts['assignee'], [(self.user.id, '@johndoe', 2), (self.user2.id, '@janedoe', 1)])
+        self.assertEqual(counts['overdue'], [(0, 'Not overdue', 2), (1, 'Overdue', 1)])
+
+    def test_facets_follow_the_search(self):
+        counts = facet_counts(search_tasks(Task.objects.all(), 'fix'))
+        self.assertEqual(counts['priority'], [(Task.Priority.HIGH, 'High', 1), (Task.Priority.LOW, 'Low', 1)])
+
+    def test_filter_by_facets(self):
+        tasks = filter_by_facets(Task.objects.all(), QueryDict('priority=1&assignee=%d' % self.user.id))
+        self.assertEqual(list(tasks), [self.later])
+        tasks = filter_by_facets(Task.objects.all(), QueryDict('overdue=1&lane=nonsense'))
+        self.assertEqual(list(tasks), [self.urgent])
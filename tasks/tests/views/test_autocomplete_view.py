@@ -1,6 +1,8 @@
 from tasks.tests.helpers import LogInTester
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
+from tasks.autocomplete import AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_TIMEOUT
 from tasks.models import Team, User, Invite
 from django.http import HttpResponse, JsonResponse
 from urllib.parse import unquote
@@ -16,6 +18,7 @@ class AutocompleteViewTestCase(TestCase, LogInTester):
     ]
     
     def setUp(self):
+        cache.clear()
         self.user = User.objects.get(username='@johndoe')
         self.team = Team.objects.get(id=1)
         self.other_user = User.objects.get(username='@janedoe')
@@ -67,3 +70,28 @@ class AutocompleteViewTestCase(TestCase, LogInTester):
         self.assertTrue(isinstance(response, JsonResponse))
         self.assertTrue("@petrapickles" in str(response.content))
 
+    def test_autocomplete_lists_prefix_matches_first(self):
+        User.objects.create_user('@picklesfan', first_name='Pickles', last_name='Fan', email='picklesfan@example.org')
+        response = self.client.get(self.url, data={'q': 'pickles'})
+        self.assertEqual(response.json()[0], '@picklesfan')
+        self.assertIn('@petrapickles', response.json())
+
+    def test_autocomplete_results_are_capped(self):
+        for number in range(AUTOCOMPLETE_LIMIT + 5):
+            User.objects.create_user(f'@petra{number}', first_name='Petra', last_name='Number', email=f'petra{number}@example.org')
+        response = self.client.get(self.url, data=self.form_input)
+        self.assertEqual(len(response.json()), AUTOCOMPLETE_LIMIT)
+
+    def test_autocomplete_response_can_be_reused_by_the_browser(self):
+        response = self.client.get(self.url, data=self.form_input)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn(f'max-age={AUTOCOMPLETE_TIMEOUT}', response['Cache-Control'])
+        response = self.client.get(self.url, data=self.form_input, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_repeated_autocomplete_request_is_served_from_the_cache(self):
+        self.client.get(self.url, data=self.form_input)
+        # Only the session and the logged in user are loaded
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, data=self.form_input)
+        self.assertIn('@petrapickles', response.json())
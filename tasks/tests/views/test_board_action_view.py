@@ -0,0 +1,113 @@
+"""Tests for the board action view."""
+from django.test import TestCase
+from django.urls import reverse
+from tasks.board import LANE_ORDER_GAP
+from tasks.models import Task, Team, User, Lane
+from tasks.tests.helpers import reverse_with_next
+
+class BoardActionViewTestCase(TestCase):
+    """Tests for the JSON board action view."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json',
+        'tasks/tests/fixtures/other_lanes.json',
+        'tasks/tests/fixtures/default_task.json',
+        'tasks/tests/fixtures/other_tasks.json'
+    ]
+
+    def setUp(self):
+        self.url = reverse('board_action')
+        self.user = User.objects.get(username='@johndoe')
+        self.team = Team.objects.get(pk=1)
+        self.lane = Lane.objects.get(pk=1)
+        self.lane2 = Lane.objects.get(pk=2)
+        self.task = Task.objects.get(pk=1)
+
+        self.client.login(username='@johndoe', password='Password123')
+        session = self.client.session
+        session['current_team_id'] = self.team.id
+        session.save()
+
+    def test_board_action_url(self):
+        self.assertEqual(self.url, '/dashboard/actions/')
+
+    def test_board_action_redirects_when_not_logged_in(self):
+        self.client.logout()
+        response = self.client.post(self.url, {'add_lane': ''})
+        self.assertRedirects(response, reverse_with_next('log_in', self.url), status_code=302, target_status_code=200)
+
+    def test_get_is_not_allowed(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
+
+    def test_add_lane(self):
+        response = self.client.post(self.url, {'add_lane': ''})
+        self.assertEqual(response.status_code, 200)
+        lane = Lane.objects.latest('id')
+        self.assertEqual(response.json(), {'lanes': [{'id': lane.id, 'name': 'New Lane', 'order': 2 + LANE_ORDER_GAP}], 'tasks': []})
+
+    def test_rename_lane(self):
+        response = self.client.post(self.url, {'rename_lane': self.lane.id, 'new_lane_name': 'Renamed'})
+        self.assertEqual(response.json()['lanes'], [{'id': self.lane.id, 'name': 'Renamed', 'order': 1}])
+        self.lane.refresh_from_db()
+        self.assertEqual(self.lane.lane_name, 'Renamed')
+
+    def test_rename_lane_with_invalid_name(self):
+        response = self.client.post(self.url, {'rename_lane': self.lane.id, 'new_lane_name': 'Bad-Name!'})
+        self.assertEqual(response.status_code, 400)
+        self.lane.refresh_from_db()
+        self.assertEqual(self.lane.lane_name, 'TestLane')
+
+    def test_move_task_right_returns_only_the_task(self):
+        response = self.client.post(self.url, {'move_task_right': self.task.id})
+        self.assertEqual(response.json(), {'lanes': [], 'tasks': [{'id': self.task.id, 'name': 'Task1', 'lane': self.lane2.id}]})
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.lane, self.lane2)
+
+    def test_move_lane_left_returns_the_renumbered_lanes(self):
+        response = self.client.post(self.url, {'move_lane_left': self.lane2.id})
+        orders = {lane['id']: lane['order'] for lane in response.json()['lanes']}
+        self.assertEqual(set(orders), {self.lane.id, self.lane2.id})
+        self.assertLess(orders[self.lane2.id], orders[self.lane.id])
+
+    def test_move_lane_with_room_returns_only_that_lane(self):
+        response = self.client.post(self.url, {'move_lane_right': self.lane.id})
+        self.assertEqual(response.json()['lanes'], [{'id': self.lane.id, 'name': 'TestLane', 'order': 2 + LANE_ORDER_GAP}])
+
+    def test_reorder_lanes(self):
+        response = self.client.post(self.url, {'reorder_lanes': [self.lane2.id, self.lane.id]})
+        orders = {lane['id']: lane['order'] for lane in response.json()['lanes']}
+        self.assertEqual(orders, {self.lane2.id: LANE_ORDER_GAP, self.lane.id: 2 * LANE_ORDER_GAP})
+
+    def test_reorder_lanes_must_list_every_lane(self):
+        response = self.client.post(self.url, {'reorder_lanes': [self.lane2.id]})
+        self.assertEqual(response.status_code, 400)
+        self.lane.refresh_from_db()
+        self.assertEqual(self.lane.lane_order, 1)
+
+    def test_move_tasks(self):
+        response = self.client.post(self.url, {'move_tasks': [1, 2], 'target_lane': self.lane2.id})
+        self.assertEqual([task['lane'] for task in response.json()['tasks']], [self.lane2.id, self.lane2.id])
+
+    def test_move_tasks_outside_the_team(self):
+        response = self.client.post(self.url, {'move_tasks': [1, 999], 'target_lane': self.lane2.id})
+        self.assertEqual(response.status_code, 400)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.lane, self.lane)
+
+    def test_cannot_move_task_of_another_team(self):
+        other_team = Team.objects.create(team_name='Other', team_creator=self.user)
+        session = self.client.session
+        session['current_team_id'] = other_team.id
+        session.save()
+        response = self.client.post(self.url, {'move_task_right': self.task.id})
+        self.assertEqual(response.status_code, 404)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.lane, self.lane)
+
+    def test_unknown_action(self):
+        response = self.client.post(self.url, {'explode': ''})
+        self.assertEqual(response.status_code, 400)
@@ -1,7 +1,8 @@
 from tasks.tests.helpers import LogInTester
 from django.test import TestCase
 from django.urls import reverse, resolve
-from tasks.models import Task, Team, User, Lane
+from tasks.board import LANE_ORDER_GAP, move_lane
+from tasks.models import Task, Team, User, Lane, Notification, Invite
 from datetime import datetime, timezone
 from tasks.forms import TaskForm
 from django.contrib.auth import get_user_model
@@ -62,10 +63,14 @@ class DashboardViewTestCase(TestCase, LogInTester):
 
         self.assertEqual(lanes.count(), 3)
 
-        default_lanes = [("Backlog", 1), ("In Progress", 2), ("Complete", 3)]
+        default_lanes = [("Backlog", LANE_ORDER_GAP), ("In Progress", 2 * LANE_ORDER_GAP), ("Complete", 3 * LANE_ORDER_GAP)]
         for lane_name, lane_order in default_lanes:
             lane = lanes.get(lane_name = lane_name)
             self.assertEqual(lane.lane_order, lane_order)
+
+        # The first move of a default lane only changes that lane
+        moved = move_lane(self.team, lanes.get(lane_name="Complete").id, -1)
+        self.assertEqual([lane.lane_name for lane in moved], ["Complete"])
     
     # Test adding a lane to the dashboard
     def test_add_lane(self):
@@ -120,8 +125,7 @@ class DashboardViewTestCase(TestCase, LogInTester):
         self.assertEqual(response.status_code, 302) 
         self.lane.refresh_from_db()
         self.lane2.refresh_from_db()
-        self.assertEqual(self.lane2.lane_order, 1) # lane2 should now be at position 1
-        self.assertEqual(self.lane.lane_order, 2) # lane should now be at position 2
+        self.assertLess(self.lane2.lane_order, self.lane.lane_order) # lane2 should now come before lane
 
     # Move a lane to the left when there is no lane to the left of it
     # Keeps the lane in its current position
@@ -139,8 +143,7 @@ class DashboardViewTestCase(TestCase, LogInTester):
         self.assertEqual(response.status_code, 302) 
         self.lane.refresh_from_db()
         self.lane2.refresh_from_db()
-        self.assertEqual(self.lane.lane_order, 2) # lane should now be at position 2
-        self.assertEqual(self.lane2.lane_order, 1) # lane2 should now be at position 1
+        self.assertGreater(self.lane.lane_order, self.lane2.lane_order) # lane should now come after lane2
 
     # Move a lane to the right when there is no lane to the right of it
     # Keeps the lane in its current position
@@ -150,4 +153,63 @@ class DashboardViewTestCase(TestCase, LogInTester):
         self.lane.refresh_from_db()
         self.lane2.refresh_from_db()
         self.assertEqual(self.lane.lane_order, 1)
-        self.assertEqual(self.lane2.lane_order, 2)
\ No newline at end of file
+        self.assertEqual(self.lane2.lane_order, 2)
+    # Viewing the dashboard must not generate deadline notifications
+    def test_dashboard_does_not_write_notifications(self):
+        before_count = Notification.objects.count()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Notification.objects.count(), before_count)
+
+
+    # The notifications menu shows the user's invites
+    def test_dashboard_shows_invite_notifications(self):
+        invite = Invite.objects.create(inviting_team=self.team2, invite_message='Please join')
+        invite.set_invited_users(self.user.username)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Do you wish to join Team2?')
+        self.assertContains(response, 'Please join')
+
+    # An unchanged dashboard is answered with 304 Not Modified
+    def test_dashboard_conditional_get(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.task.name = 'Renamed task'
+        self.task.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    # Logging in again gives a new CSRF secret, so the old copy's forms would be refused
+    def test_dashboard_etag_depends_on_login(self):
+        self.client.get(self.url)
+        etag = self.client.get(self.url)['ETag']
+        self.client.logout()
+        self.client.login(username=self.user.username, password='Password123')
+        # The first visit puts the team back in the session
+        self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    # Switching to another team gives a different ETag
+    def test_dashboard_etag_depends_on_team(self):
+        etag = self.client.get(self.url)['ETag']
+        self.team2.add_invited_member(self.user)
+        response = self.client.get(self.url, {'dashboard_team': self.team2.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    # Returning to a team whose page is still cached switches the session to it
+    def test_dashboard_switches_team_before_answering_not_modified(self):
+        self.team2.add_invited_member(self.user)
+        # The first visit gives the new team its default lanes
+        self.client.get(self.url, {'dashboard_team': self.team2.id})
+        self.client.get(self.url, {'dashboard_team': self.team.id})
+        etag = self.client.get(self.url, {'dashboard_team': self.team2.id})['ETag']
+        self.client.get(self.url, {'dashboard_team': self.team.id})
+        response = self.client.get(self.url, {'dashboard_team': self.team2.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(str(self.client.session['current_team_id']), str(self.team2.id))
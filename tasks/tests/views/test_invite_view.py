@@ -69,3 +69,12 @@ class InviteViewTestCase(TestCase, LogInTester):
         self.assertTemplateUsed(response, 'dashboard.html')
         self.assertTrue(Invite.objects.all().first() is None)
         
+
+    def test_create_invite_reports_unknown_usernames(self):
+        bad_input = {
+            "users_to_invite": "@johndoe @nobody",
+            "invite_message": "Please join my team!",
+        }
+        response = self.client.post(self.url, data=bad_input, follow=True)
+        self.assertContains(response, "Could not find @nobody!")
+        self.assertTrue(self.user in Invite.objects.get().invited_users.all())
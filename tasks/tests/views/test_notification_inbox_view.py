@@ -0,0 +1,81 @@
+"""Tests for the notification inbox view."""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from tasks.models import User, Team, Lane, Task, TaskNotification
+from tasks.notifications import INBOX_PAGE_SIZE, bulk_send_notifications, notification_counts
+from tasks.tests.helpers import reverse_with_next
+
+class NotificationInboxViewTestCase(TestCase):
+    """Tests for the notification inbox view."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json'
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.get(username='@johndoe')
+        self.team = Team.objects.get(pk=1)
+        self.team.add_invited_member(self.user)
+        self.task = Task.objects.create(
+            name='Test task',
+            due_date=timezone.now() + timedelta(days=10),
+            lane=Lane.objects.get(pk=1),
+            assigned_team=self.team
+        )
+        self.notifications = bulk_send_notifications(
+            (self.user.id, TaskNotification(task=self.task)) for _ in range(INBOX_PAGE_SIZE + 5)
+        )
+        self.url = reverse('notification_inbox')
+        self.client.login(username=self.user.username, password='Password123')
+        session = self.client.session
+        session['current_team_id'] = self.team.id
+        session.save()
+
+    def test_notification_inbox_url(self):
+        self.assertEqual(self.url, '/notifications/')
+
+    def test_get_inbox_redirects_when_not_logged_in(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertRedirects(response, reverse_with_next('log_in', self.url), status_code=302, target_status_code=200)
+
+    def test_first_page_has_newest_notifications(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'notification_inbox.html')
+        page = response.context['notifications']
+        self.assertEqual(len(page), INBOX_PAGE_SIZE)
+        self.assertEqual(page[0].id, self.notifications[-1].id)
+        self.assertEqual(response.context['next_cursor'], page[-1].id)
+
+    def test_next_page_continues_from_cursor(self):
+        first_page = self.client.get(self.url).context
+        response = self.client.get(self.url, {'before': first_page['next_cursor']})
+        page = response.context['notifications']
+        self.assertEqual([notification.id for notification in page], [notification.id for notification in reversed(self.notifications[:5])])
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_viewing_a_page_marks_it_read(self):
+        self.assertEqual(notification_counts(self.user), {'unread': INBOX_PAGE_SIZE + 5, 'total': INBOX_PAGE_SIZE + 5})
+        self.client.get(self.url)
+        self.assertEqual(notification_counts(self.user), {'unread': 5, 'total': INBOX_PAGE_SIZE + 5})
+
+    def test_page_cost_does_not_depend_on_depth(self):
+        cursor = self.client.get(self.url).context['next_cursor']
+        bulk_send_notifications((self.user.id, TaskNotification(task=self.task)) for _ in range(100))
+        with self.assertNumQueries(self._count_queries(self.url)):
+            self.client.get(self.url, {'before': cursor})
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return len(queries)
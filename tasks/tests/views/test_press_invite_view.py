@@ -1,6 +1,7 @@
 from tasks.tests.helpers import LogInTester
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 from tasks.models import Team, User, Invite
 from urllib.parse import unquote
 
@@ -71,3 +72,12 @@ class PressInviteViewTestCase(TestCase, LogInTester):
         self.assertTemplateUsed(response, 'dashboard.html')
         self.assertFalse(self.user in self.team.get_team_members())
         
+
+    def test_expired_invite_cannot_be_accepted(self):
+        self.invite.expires_at = timezone.now()
+        self.invite.save()
+        self.form_input["status"] = "Accept"
+        response = self.client.post(self.url, follow=True, data=self.form_input)
+        self.assertContains(response, "This invite has expired!")
+        self.assertFalse(self.user in self.team.get_team_members())
+        self.assertFalse(Invite.objects.filter(pk=self.invite.pk).exists())
@@ -0,0 +1,46 @@
+"""Tests for the task export view."""
+import json
+from django.test import TestCase
+from django.urls import reverse
+from tasks.tests.helpers import reverse_with_next
+
+class TaskExportViewTestCase(TestCase):
+    """Tests for streaming task search results."""
+
+    fixtures = [
+        'tasks/tests/fixtures/default_user.json',
+        'tasks/tests/fixtures/other_users.json',
+        'tasks/tests/fixtures/default_team.json',
+        'tasks/tests/fixtures/default_lane.json',
+        'tasks/tests/fixtures/other_tasks.json'
+    ]
+
+    def setUp(self):
+        self.url = reverse('task_export')
+        self.client.login(username='@johndoe', password='Password123')
+
+    def test_task_export_url(self):
+        self.assertEqual(self.url, '/task_search/export/')
+
+    def test_export_redirects_when_not_logged_in(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertRedirects(response, reverse_with_next('log_in', self.url), status_code=302, target_status_code=200)
+
+    def test_csv_export_is_streamed(self):
+        response = self.client.get(self.url, {'q': 'Task3'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment', response['Content-Disposition'])
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('Task3', lines[1])
+
+    def test_jsonl_export_follows_the_search_order(self):
+        response = self.client.get(self.url, {'format': 'jsonl', 'sort_column': 'priority', 'sort_direction': 'desc'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['Task5', 'Task2', 'Task4', 'Task3'])
+
+    def test_unknown_format(self):
+        response = self.client.get(self.url, {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
@@ -77,8 +77,72 @@ class TaskSearchViewTests(TestCase, LogInTester):
         self.assertContains(response, "Task4")
         self.assertContains(response, "Task5")
 
+    def test_search_conditional_get(self):
+        etag = self.client.get(reverse('task_search'), {'q': 'Task3'})['ETag']
+        response = self.client.get(reverse('task_search'), {'q': 'Task3'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.task.name = 'Task3 renamed'
+        self.task.save()
+        response = self.client.get(reverse('task_search'), {'q': 'Task3'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_results_are_paginated(self):
+        response = self.client.get(reverse('task_search'), {'sort_column': 'due_date'})
+        self.assertNotIn('next_query', response.context)
+        self.assertTrue(response.context['is_first_page'])
+
+    def test_pages_follow_each_other(self):
+        for number in range(30):
+            Task.objects.create(name=f'Extra {number}', lane=self.lane, assigned_team=self.team)
+        seen = []
+        query = 'sort_column=due_date&sort_direction=desc'
+        while query:
+            response = self.client.get(reverse('task_search') + '?' + query)
+            seen += [task.id for task in response.context['data']]
+            query = response.context.get('next_query')
+        self.assertEqual(len(seen), 34)
+        self.assertEqual(len(set(seen)), 34)
 
+    def test_each_page_costs_the_same_queries(self):
+        for number in range(60):
+            task = Task.objects.create(name=f'Extra {number}', lane=self.lane, assigned_team=self.team)
+            task.assigned_users.add(self.user)
+        next_query = self.client.get(reverse('task_search')).context['next_query']
+        with self.assertNumQueries(4):
+            self.client.get(reverse('task_search'))
+        with self.assertNumQueries(4):
+            self.client.get(reverse('task_search') + '?' + next_query)
 
+    def test_invalid_cursor_gives_first_page(self):
+        response = self.client.get(reverse('task_search'), {'after': 'nonsense'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['data']), 4)
+
+    def test_sorting_by_priority_keeps_the_search_filter(self):
+        response = self.client.get(reverse('task_search'), {'q': 'Task3', 'sort_column': 'priority'})
+        self.assertEqual([task.name for task in response.context['data']], ['Task3'])
 
+    def test_priority_sort_is_served_by_an_index(self):
+        tasks = Task.objects.order_by('-priority', 'id')
+        plan = tasks.explain()
+        self.assertIn('task_priority_idx', plan)
 
+    def test_facets_are_shown_and_narrow_the_results(self):
+        response = self.client.get(reverse('task_search'))
+        titles = [facet['title'] for facet in response.context['facets']]
+        self.assertIn('Priority', titles)
+        priority = next(facet for facet in response.context['facets'] if facet['title'] == 'Priority')
+        high = next(choice for choice in priority['choices'] if choice['label'] == 'High')
+        self.assertEqual(high['count'], 1)
+        response = self.client.get(reverse('task_search') + '?' + high['query'])
+        self.assertEqual([task.name for task in response.context['data']], ['Task5'])
 
+    def test_results_can_be_narrowed_to_blocked_tasks(self):
+        Lane.objects.create(lane_name='Done', lane_order=2, team=self.team)
+        self.task.dependencies.add(self.task2)
+        response = self.client.get(reverse('task_search') + '?blocked=true')
+        self.assertEqual([task.name for task in response.context['data']], [self.task.name])
+        self.assertTrue(response.context['blocked_only'])
+        self.assertNotIn('blocked', response.context['blocked_query'])
+        response = self.client.get(reverse('task_search') + '?blocked=false')
+        self.assertNotIn(self.task.name, [task.name for task in response.context['data']])
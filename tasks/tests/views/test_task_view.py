@@ -58,6 +58,12 @@ class TaskViewTestCase(TestCase, LogInTester):
         self.assertIn('task', response.context)
         self.assertEqual(response.context['task'], self.task)
 
-
-        
-    
\ No newline at end of file
+    def test_task_view_conditional_get(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.task.description = 'Changed description'
+        self.task.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Changed description')
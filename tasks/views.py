@@ -4,8 +4,10 @@ from django.contrib import messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.shortcuts import redirect, render, get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control, set_response_etag
+from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.generic import DeleteView
 from django.views.generic.edit import FormView, UpdateView
@@ -16,14 +18,17 @@ from django.urls import reverse_lazy
 from django.views.decorators.http import require_POST
 from .forms import TaskForm, TaskDeleteForm, AssignTaskForm
 from .models import Task, Invite, Team, Lane, Notification, User
-from django.http import HttpResponse, JsonResponse
+from .board import LANE_ORDER_GAP, apply_board_action, load_board, serialize_changes
+from .revisions import render_fragment
+from .search import FACETS, facet_counts, order_tasks, paginate_tasks, search_from_params
+from .exports import EXPORT_FORMATS
+from .conditional import conditional_page, dashboard_stamp, search_stamp, task_stamp
+from .notifications import invalidate_notification_counts, load_inbox_page, mark_read, recipient_ids
+from .autocomplete import AUTOCOMPLETE_TIMEOUT, suggest_invitees
+from .dependencies import dependency_graph
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from datetime import datetime
-from django.db.models import Max, Case, Value, When
-
-def detect_keydates(team):
-    tasks = Task.objects.filter(assigned_team = team)
-    for task in tasks:
-        task.notify_keydates()
+from django.utils.functional import SimpleLazyObject
 
 def formatDateTime(input_date):
     # Parse the input string
@@ -38,16 +43,21 @@ class DashboardView(LoginRequiredMixin, View):
     template_name = 'dashboard.html'
     success_url = reverse_lazy('dashboard')
 
+    def dispatch(self, request, *args, **kwargs):
+        """Switch to the team asked for before the page is compared with the client's copy"""
+
+        # A 304 answered before the switch would leave the session on the old team
+        if request.user.is_authenticated and 'dashboard_team' in request.GET:
+            request.session["current_team_id"] = request.GET.get("dashboard_team")
+        return super().dispatch(request, *args, **kwargs)
+
+    @method_decorator(conditional_page(dashboard_stamp))
     def get(self, request, *args, **kwargs):
         """"Display dashboard data"""
         current_user = request.user
         teams = current_user.get_teams()
 
         # Get the current team
-        if 'dashboard_team' in request.GET:
-            team_id = request.GET.get("dashboard_team")
-            request.session["current_team_id"] = team_id
-
         current_team_id = request.session.get("current_team_id", None)
         current_team = Team.objects.filter(id=current_team_id).first() if current_team_id else None
 
@@ -56,38 +66,41 @@ class DashboardView(LoginRequiredMixin, View):
             current_team = teams.first()
 
         self.create_default_lanes(current_team)
-        detect_keydates(current_team)
 
         return render(request, self.template_name, self.get_context_data(current_user, current_team))
     
     # Create 3 default lanes when a new team is made or if all lanes are deleted
+    # They are spaced LANE_ORDER_GAP apart like every other lane, so the first move does not rebalance them
     def create_default_lanes(self, current_team):
-        default_lane_names = [("Backlog", 1), ("In Progress", 2), ("Complete", 3)]
+        default_lane_names = ["Backlog", "In Progress", "Complete"]
         if not Lane.objects.filter(team=current_team).exists():
-            for lane_name, lane_order in default_lane_names:
+            for position, lane_name in enumerate(default_lane_names, start=1):
                 Lane.objects.get_or_create(
                     lane_name=lane_name,
-                    lane_order=lane_order,
+                    lane_order=position * LANE_ORDER_GAP,
                     team=current_team
                 )
 
     # Return dashboard data to render
+    # The board, task popups and team info are cached per team revision, so the lanes are only loaded on a miss
     def get_context_data(self, current_user, current_team):
-        if current_team:
-            lanes = Lane.objects.filter(team=current_team).order_by('lane_order')
-            team_tasks = current_team.get_tasks()
-        else:    
-            Lane.objects.none()
-            Task.objects.none()
+        lanes = SimpleLazyObject(lambda: load_board(current_team))
         assign_task_form = AssignTaskForm(team=current_team)
         create_task_form = TaskForm(team=current_team)
         invite_form = InviteForm()
         create_team_form = CreateTeamForm()
+        is_creator = current_team is not None and current_team.team_creator_id == current_user.id
 
         return {
             'user': current_user,
-            'lanes': lanes,
-            'tasks': team_tasks,
+            'board': render_fragment(self.request, 'partials/board.html', {'lanes': lanes}, current_team),
+            'task_create_popups': render_fragment(
+                self.request, 'partials/task_create_popups.html',
+                {'lanes': lanes, 'create_task_form': create_task_form}, current_team
+            ),
+            'team_info': render_fragment(
+                self.request, 'team_info.html', {'team': current_team, 'user': current_user}, current_team, vary=(is_creator,)
+            ),
             'teams': current_user.get_teams(),
             "current_team": current_team,
             "assign_task_form" : assign_task_form,
@@ -103,115 +116,48 @@ class DashboardView(LoginRequiredMixin, View):
         current_team_id = request.session.get("current_team_id")
         current_team = Team.objects.get(id=current_team_id)
 
-        if 'add_lane' in request.POST:
-            self.add_lane(current_team)
+        try:
+            apply_board_action(current_team, request.POST)
+        except ValidationError as error:
+            for message in error.messages:
+                messages.add_message(request, messages.ERROR, message)
 
-        elif 'rename_lane' in request.POST:
-            self.rename_lane(request, current_team)
+        return redirect('dashboard')
 
-        elif 'move_task_left' in request.POST:
-            self.move_task_left(request)
-        
-        elif 'move_task_right' in request.POST:
-            self.move_task_right(request)
-        
-        elif 'move_lane_left' in request.POST:
-            self.move_lane_left(request)
-        
-        elif 'move_lane_right' in request.POST:
-            self.move_lane_right(request)
+class BoardActionView(LoginRequiredMixin, View):
+    """Apply a dashboard action and return only the lanes and tasks it changed as JSON"""
 
-        return redirect('dashboard')
-    
-    # Adding a lane to the dashboard
-    def add_lane(self, current_team):
-        max_order = Lane.objects.filter(team=current_team).aggregate(Max('lane_order'))['lane_order__max'] or 0
-        Lane.objects.create(lane_name="New Lane", lane_order=max_order + 1, team=current_team)
-    
-    # Renaming a lane
-    def rename_lane(self, request, current_team):
-        lane_id = request.POST.get('rename_lane')
-        new_lane_name = request.POST.get('new_lane_name')
-        lane = Lane.objects.filter(id=lane_id, team=current_team).first()
-        if lane:
-            lane.lane_name = new_lane_name
-            lane.save()
-    
-    # Moving a task to the lane on the left
-    def move_task_left(self, request):
-        task_id = request.POST.get('move_task_left')
-        task = get_object_or_404(Task, pk=task_id)
-        current_lane = task.lane
-        # Filter left lanes within the same team
-        left_lane = Lane.objects.filter(lane_order__lt=current_lane.lane_order, team=current_lane.team).order_by('-lane_order').first()
-        if left_lane:
-            task.lane = left_lane
-            task.save()
-    
-    # Moving a task to the lane on the right
-    def move_task_right(self, request):
-        task_id = request.POST.get('move_task_right')
-        task = get_object_or_404(Task, pk=task_id)
-        current_lane = task.lane
-        # Filter right lanes within the same team
-        right_lane = Lane.objects.filter(lane_order__gt=current_lane.lane_order, team=current_lane.team).order_by('lane_order').first()
-        if right_lane:
-            task.lane = right_lane
-            task.save()
-    
-    # Moving the lane to the left i.e. putting it 1 lane before in the lane ordering
-    def move_lane_left(self, request):
-        lane_id = request.POST.get('move_lane_left')
-        lane = get_object_or_404(Lane, pk=lane_id)
-        previous_lane = Lane.objects.filter(lane_order__lt=lane.lane_order, team=lane.team).order_by('-lane_order').first()
-
-        if previous_lane:
-            # temp value to avoid unique value constraint
-            temp_order = -1
-            lane.lane_order, previous_lane.lane_order = temp_order, lane.lane_order
-            lane.save()
-            previous_lane.save()
-            lane.lane_order = previous_lane.lane_order - 1
-            lane.save()
-    
-    # Moving the lane to the left i.e. putting it 1 lane after in the lane ordering
-    def move_lane_right(self, request):
-        lane_id = request.POST.get('move_lane_right')
-        lane = get_object_or_404(Lane, pk=lane_id)
-        next_lane = Lane.objects.filter(lane_order__gt=lane.lane_order, team=lane.team).order_by('lane_order').first()
-        if next_lane:
-            # temp value to avoid unique value constraint
-            temp_order = -1
-            lane.lane_order, next_lane.lane_order = temp_order, lane.lane_order
-            lane.save()
-            next_lane.save()
-            lane.lane_order = next_lane.lane_order + 1
-            lane.save()
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        """Handle the same actions as the dashboard form posts without re-rendering the board"""
+
+        current_team = Team.objects.filter(id=request.session.get("current_team_id")).first()
+        if current_team is None:
+            return JsonResponse({'errors': ['No team selected.']}, status=400)
+
+        try:
+            changes = apply_board_action(current_team, request.POST)
+        except ValidationError as error:
+            return JsonResponse({'errors': error.messages}, status=400)
+        if changes is None:
+            return JsonResponse({'errors': ['Unknown board action.']}, status=400)
+
+        return JsonResponse(serialize_changes(*changes))
 
 # Autocomplete Query
         
 def autocomplete_user(request):
     """Given a query string q, give suggestions for which user it could be"""
     if request.GET.get('q'):
-        q = request.GET['q']
-        queried_users = q.split(" ")
-        new_query = queried_users[-1]
-
-        # Exclude the current user from query
-        queried_users.append(request.user.username) 
-
-        # Exclude all members who are already a part of the team
-        current_team = Team.objects.get(id=request.session["current_team_id"])
-        user_set = User.objects.exclude(id__in=current_team.get_team_members())
-        
-        # Exclude all users already part of string
-        if len(queried_users) > 1:
-            data = user_set.exclude(username__in=queried_users).filter(username__icontains=new_query).values_list('username', flat=True)
-        else:
-            data = user_set.filter(username__icontains=new_query).values_list('username', flat=True)
-        
-        json = list(data)
-        return JsonResponse(json, safe=False)
+        # Suggestions leave out the current user, team members and users already part of the string
+        json = suggest_invitees(request.session["current_team_id"], request.GET['q'], request.user.username)
+        response = JsonResponse(json, safe=False)
+
+        # Let the browser reuse the suggestions while the user types and deletes
+        set_response_etag(response)
+        patch_cache_control(response, private=True, max_age=AUTOCOMPLETE_TIMEOUT)
+        return get_conditional_response(request, etag=response['ETag'], response=response)
     else:
         return HttpResponse("Wrong Query")
 
@@ -266,7 +212,11 @@ def press_invite(request):
         invite = Invite.objects.get(id=request.POST.get('id'))
         user = request.user
 
-        if request.POST.get('status'):
+        if invite.has_expired():
+            messages.add_message(request, messages.ERROR, "This invite has expired!")
+            invite.status = "Reject"
+            invite.close(user)
+        elif request.POST.get('status'):
             invite.status = request.POST.get('status')
             invite.close(user)
         else:
@@ -589,53 +539,106 @@ class TaskView(LoginRequiredMixin, View):
         """Return redirect URL after successful update."""
         return reverse_lazy('dashboard')
     
+    @method_decorator(conditional_page(task_stamp))
     def get(self, request, pk, *args, **kwargs):
         """Get request method to return information about a given task"""
-        task = get_object_or_404(Task, pk=pk)
-        context = {'task': task}
+        task = get_object_or_404(Task.objects.select_related('assigned_team'), pk=pk)
+        graph = dependency_graph(task.assigned_team)
+        try:
+            critical_path = graph.names_of(graph.critical_path(task.id))
+        except ValidationError:
+            critical_path = []
+        context = {
+            'task': task,
+            'blockers': graph.names_of(sorted(graph.blockers(task.id))),
+            'critical_path': critical_path,
+        }
         return render(request, self.template_name, context)
     
-priority_order = Case(
-    When(priority='high', then=Value(3)),
-    When(priority='medium', then=Value(2)),
-    When(priority='low', then=Value(1))
-)
-
+def facet_choices(request, counts):
+    """Return the facets of a search, each value with a link that selects it or clears it again"""
+
+    facets = []
+    for facet, title in FACETS.items():
+        choices = []
+        for value, label, count in counts[facet]:
+            query = request.GET.copy()
+            query.pop('after', None)
+            selected = query.get(facet) == str(value)
+            if selected:
+                query.pop(facet)
+            else:
+                query[facet] = value
+            choices.append({'label': label, 'count': count, 'selected': selected, 'query': query.urlencode()})
+        if choices:
+            facets.append({'title': title, 'choices': choices})
+    return facets
+
+@conditional_page(search_stamp)
 def task_search(request):
     """ Function to search for a task """
 
-    q = request.GET.get('q', '')
-    data = Task.objects.all()
-    # If a search query is provided, filter tasks based on the 'name' field containing the query string.
-    if q:
-        data = data.filter(name__icontains=q)
-
-    sort_column = request.GET.get('sort_column', None)
-    sort_direction = request.GET.get('sort_direction', None)
-    if sort_column == 'priority':
-        data=data.model.objects.alias(priority_order=priority_order)
-        sort_column = 'priority_order'
-    if sort_column:
-        # Sort in descending order if 'desc' is specified.
-        if sort_direction == 'desc':
-          data = data.order_by('-'+sort_column)
-        else:
-          # Default is ascending order
-          data = data.order_by(sort_column)
-
-    context = {'data': data}
-    if not data.exists():
+    data, sort_field, descending = search_from_params(request.GET)
+
+    after = request.GET.get('after')
+    page, next_cursor = paginate_tasks(data, sort_field, descending, after)
+
+    context = {'data': page, 'is_first_page': not after, 'facets': facet_choices(request, facet_counts(data))}
+    if next_cursor:
+        next_query = request.GET.copy()
+        next_query['after'] = next_cursor
+        context['next_query'] = next_query.urlencode()
+    if after:
+        first_query = request.GET.copy()
+        del first_query['after']
+        context['first_query'] = first_query.urlencode()
+    export_query = request.GET.copy()
+    export_query.pop('after', None)
+    context['export_query'] = export_query.urlencode()
+    blocked_query = export_query.copy()
+    if blocked_query.pop('blocked', None) != ['true']:
+        blocked_query['blocked'] = 'true'
+    context['blocked_query'] = blocked_query.urlencode()
+    context['blocked_only'] = request.GET.get('blocked') == 'true'
+    if not page:
         context['no_tasks_found'] = True
 
     return render(request, 'task_search.html', context)
 
+@login_required
+def task_export(request):
+    """Stream every task matching a search, in its search order, as CSV or JSON Lines"""
+
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponse('Unknown export format.', status=400)
+    content_type, stream = EXPORT_FORMATS[export_format]
+
+    tasks, sort_field, descending = search_from_params(request.GET)
+    tasks, _ = order_tasks(tasks, sort_field, descending)
+    response = StreamingHttpResponse(stream(tasks), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="tasks.{export_format}"'
+    return response
+
 def notif_delete(request,notif_id):
     """"Function to delete a notification"""
 
     notification = Notification.objects.get(pk=notif_id)
+    invalidate_notification_counts(recipient_ids([notification]))
     notification.delete()
     return redirect('dashboard')
 
+@login_required
+def notification_inbox(request):
+    """Display one page of the user's notifications, newest first"""
+
+    before = request.GET.get('before')
+    before = int(before) if before and before.isdigit() else None
+    notifications, next_cursor = load_inbox_page(request.user, before=before)
+    mark_read(request.user, notifications)
+    context = {'notifications': notifications, 'next_cursor': next_cursor, 'is_first_page': before is None}
+    return render(request, 'notification_inbox.html', context)
+
 class InviteView(LoginRequiredMixin, FormView):
     """View to invite team member"""
 
@@ -647,6 +650,8 @@ class InviteView(LoginRequiredMixin, FormView):
         
         inviting_team = Team.objects.get(id=self.request.session["current_team_id"])
         form.send_invite(inviting_team=inviting_team)
+        if form.unknown_usernames:
+            messages.add_message(self.request, messages.ERROR, f"Could not find {', '.join(form.unknown_usernames)}!")
         return super().form_valid(form)
 
     def form_invalid(self, form):